@@ -1,4 +1,4 @@
-from flask import Flask, request, jsonify, send_file
+from flask import Flask, Response, request, jsonify
 from flask_cors import CORS
 import subprocess
 import re
@@ -6,7 +6,17 @@ from jgaad_ai_agent_backup import jgaad_chat_with_gemini
 import gemini_fin_path
 import mutual_funds_model  # Import the mutual funds model script
 from stock_final_model_yug import generate_response_from_stock_info  # Import the stock analysis function
-from stock_report_generator import generate_stock_report  # Import the report generation function
+from stock_report_generator import build_stock_report, get_stock_report, report_key  # Import the report generation functions
+from helper.ttl_cache import market_cache
+from helper.indicator_cache import indicator_cache
+from helper.chart_cache import chart_cache
+from helper.batch_quotes import get_batch_quotes, quote_symbol
+from helper.chart_data import chart_data
+from helper.report_jobs import DONE, FAILED, QueueFull, ReportJobQueue
+from helper.report_artifacts import report_etag, report_store
+from werkzeug.http import http_date
+from helper.screener import screen
+from helper.streaming_indicators import live_indicators
 import os
 import sys
 import json
@@ -22,6 +32,16 @@ logger = logging.getLogger('ml_api')
 app = Flask(__name__)
 CORS(app)
 
+# Reports are streamed to clients in pieces of this many bytes
+REPORT_CHUNK_SIZE = 64 * 1024
+
+def job_key(ticker):
+    """Report job key: the stored report key from the history on disk, without downloading"""
+    return report_key(ticker, refresh=False)
+
+# Background report generation for the async job endpoints, one job per stored report key
+report_jobs = ReportJobQueue(get_stock_report, key=job_key)
+
 def is_valid_ticker(ticker):
     """
     Validate if the provided ticker is a valid stock symbol.
@@ -31,6 +51,43 @@ def is_valid_ticker(ticker):
     # Basic validation - add more robust validation as needed
     return ticker and isinstance(ticker, str) and len(ticker) > 0
 
+def stream_pdf(data, filename, headers=None, chunk_size=REPORT_CHUNK_SIZE):
+    """Response sending PDF bytes as an attachment in chunks, with a Content-Length"""
+    view = memoryview(data)
+    
+    def chunks():
+        for start in range(0, len(view), chunk_size):
+            yield bytes(view[start:start + chunk_size])
+    
+    return Response(
+        chunks(),
+        mimetype='application/pdf',
+        headers={
+            **(headers or {}),
+            'Content-Length': str(len(data)),
+            'Content-Disposition': f'attachment; filename="{filename}"',
+        },
+    )
+
+def send_report(ticker):
+    """
+    Stored report for `ticker` (built on the first request for its key), with
+    ETag and Last-Modified. A matching If-None-Match gets a 304 without the
+    report being loaded or built; If-Modified-Since is honoured as well.
+    """
+    key = report_key(ticker)
+    etag = report_etag(key)
+    headers = {'ETag': f'W/"{etag}"', 'Cache-Control': 'no-cache'}
+    if request.if_none_match.contains_weak(etag):
+        return Response(status=304, headers=headers)
+    
+    artifact = report_store.get_or_build(key, lambda: build_stock_report(ticker))
+    headers['Last-Modified'] = http_date(artifact.last_modified)
+    if not request.if_none_match and request.if_modified_since is not None \
+            and int(artifact.last_modified) <= request.if_modified_since.timestamp():
+        return Response(status=304, headers=headers)
+    return stream_pdf(artifact.pdf, artifact.filename, headers)
+
 @app.route('/', methods=['GET'])
 def home():
     return jsonify("HI")
@@ -128,19 +185,20 @@ def analyse_stock():
             "success": False
         }), 500
 
-@app.route('/generate-stock-report', methods=['POST'])
+@app.route('/generate-stock-report', methods=['GET', 'POST'])
 def generate_report():
     """
     Flask endpoint to generate a comprehensive PDF stock report with visualizations.
-    Accepts a ticker symbol and returns a PDF file.
+    Accepts a ticker symbol and returns a PDF file. Reports are stored per ticker,
+    data as-of date and report version, and support conditional requests.
     """
     try:
         logger.info("[API Request] Report generation request received")
-        if 'ticker' not in request.form:
+        if 'ticker' not in request.values:
             logger.error("[API Error] No ticker provided in form data")
             return jsonify({"error": "No ticker provided"}), 400
             
-        ticker = request.form['ticker']
+        ticker = request.values['ticker']
         logger.info(f"[API Processing] Generating report for ticker: {ticker}")
         
         # Validate ticker
@@ -148,14 +206,66 @@ def generate_report():
             logger.error(f"[API Error] Invalid ticker: {ticker}")
             return jsonify({"error": "Invalid ticker"}), 400
             
-        # Generate report
-        report_path = generate_stock_report(ticker)
-        logger.info(f"[API Response] Report generated successfully for {ticker}")
-        return send_file(report_path, as_attachment=True)
+        # Async mode: queue the report and return a job id to poll
+        if str(request.values.get('async', '')).lower() in ('1', 'true', 'yes'):
+            return enqueue_report(ticker)
+        
+        # Serve the stored report, building it in memory on a miss (no shared file on disk)
+        response = send_report(ticker)
+        logger.info(f"[API Response] Report for {ticker}: {response.status_code}")
+        return response
     except Exception as e:
         logger.error(f"[API Error] Report generation failed: {str(e)}")
         return jsonify({"error": str(e)}), 500
 
+def enqueue_report(ticker):
+    """Queue a report job (merged with any job for the same stored report) and describe it"""
+    try:
+        job = report_jobs.submit(ticker)
+    except QueueFull as e:
+        return jsonify({"error": str(e), "success": False}), 503
+    logger.info(f"[API Processing] Report job {job.id} for {ticker}: {job.status}")
+    return jsonify({
+        "success": True,
+        **job.to_dict(),
+        "status_url": f"/report-jobs/{job.id}",
+        "download_url": f"/report-jobs/{job.id}/download",
+    }), 202
+
+@app.route('/report-jobs', methods=['POST'])
+def create_report_job():
+    """
+    Flask endpoint queueing a stock report for background generation.
+    Accepts a 'ticker' (form or JSON) and returns a job id at once.
+    """
+    params = request.get_json() if request.is_json else request.form
+    ticker = params.get('ticker')
+    if not is_valid_ticker(ticker):
+        return jsonify({"error": "No ticker provided", "success": False}), 400
+    return enqueue_report(ticker.strip())
+
+@app.route('/report-jobs/<job_id>', methods=['GET'])
+def report_job_status(job_id):
+    """Flask endpoint returning the status of a report job"""
+    job = report_jobs.get(job_id)
+    if job is None:
+        return jsonify({"error": "Unknown or expired job", "success": False}), 404
+    return jsonify({"success": True, **job.to_dict()})
+
+@app.route('/report-jobs/<job_id>/download', methods=['GET'])
+def download_report_job(job_id):
+    """Flask endpoint streaming a finished report job's PDF"""
+    job = report_jobs.get(job_id)
+    if job is None:
+        return jsonify({"error": "Unknown or expired job", "success": False}), 404
+    if job.status == FAILED:
+        return jsonify({"error": job.error, "success": False, **job.to_dict()}), 500
+    if job.status != DONE:
+        return jsonify({"error": "Report is not ready yet", "success": False, **job.to_dict()}), 409
+    # Rebuilt if the store evicted it since the job finished
+    artifact = report_store.get_or_build(job.report_key, lambda: build_stock_report(job.ticker))
+    return stream_pdf(artifact.pdf, artifact.filename)
+
 @app.route('/ai-financial-path', methods=['POST'])
 def ai_financial_path():
     try:
@@ -191,6 +301,126 @@ def ai_financial_path():
             'message': f'Error generating financial path: {str(e)}'
         }), 500
 
+@app.route('/batch-quotes', methods=['GET', 'POST'])
+def batch_quotes():
+    """
+    Flask endpoint returning last price, change and volume for many tickers.
+    Accepts a JSON list under 'tickers' or a comma separated 'tickers' parameter.
+    """
+    try:
+        if request.is_json:
+            tickers = request.get_json().get('tickers', [])
+        else:
+            tickers = request.values.get('tickers', '')
+        if isinstance(tickers, str):
+            tickers = tickers.split(',')
+        tickers = [t.strip() for t in tickers if isinstance(t, str) and t.strip()]
+        
+        if not tickers:
+            return jsonify({"error": "Please provide a list of tickers", "success": False}), 400
+        
+        logger.info(f"[API Processing] Fetching batch quotes for {len(tickers)} tickers")
+        quotes = get_batch_quotes(tickers)
+        return jsonify({"success": True, "quotes": quotes})
+    except ValueError as e:
+        return jsonify({"error": str(e), "success": False}), 400
+    except Exception as e:
+        logger.error(f"[API Error] Batch quotes failed: {str(e)}")
+        return jsonify({"error": str(e), "success": False}), 500
+
+@app.route('/cache-stats', methods=['GET'])
+def cache_stats():
+    """Hit/miss counters of the shared market data, indicator, chart and report caches, for sizing them"""
+    return jsonify({
+        **market_cache.stats(),
+        "indicators": indicator_cache.stats(),
+        "charts": chart_cache.stats(),
+        "reports": report_store.stats(),
+    })
+
+@app.route('/screen', methods=['GET', 'POST'])
+def screen_stocks():
+    """
+    Flask endpoint screening every locally stored ticker with a filter expression,
+    e.g. {"filter": "golden_cross and rsi < 40", "sort": "rsi", "limit": 50}.
+    An optional 'tickers' list restricts the universe; tickers missing from the
+    local store are reported under 'skipped'.
+    """
+    try:
+        params = request.get_json() if request.is_json else request.values
+        expression = (params.get('filter') or '').strip()
+        if not expression:
+            return jsonify({"error": "Please provide a filter expression", "success": False}), 400
+        
+        tickers = params.get('tickers')
+        if isinstance(tickers, str):
+            tickers = tickers.split(',')
+        if tickers:
+            # Stored under their NSE symbols, e.g. "TCS" -> "TCS.NS"
+            tickers = [quote_symbol(t) for t in tickers if isinstance(t, str) and t.strip()]
+        
+        logger.info(f"[API Processing] Screening with filter: {expression}")
+        result = screen(
+            expression,
+            symbols=tickers or None,
+            sort_by=params.get('sort') or None,
+            descending=str(params.get('order', 'desc')).lower() != 'asc',
+            limit=int(params.get('limit', 100)),
+            cross_days=int(params.get('cross_days', 5)),
+        )
+        return jsonify({"success": True, **result})
+    except ValueError as e:
+        return jsonify({"error": str(e), "success": False}), 400
+    except Exception as e:
+        logger.error(f"[API Error] Screen failed: {str(e)}")
+        return jsonify({"error": str(e), "success": False}), 500
+
+@app.route('/chart-data', methods=['GET'])
+def get_chart_data():
+    """
+    Flask endpoint returning a ticker's close and 50/200 moving averages as JSON
+    for client-side charts, e.g. ?ticker=TCS&period=10y&interval=1d&points=800.
+    Long ranges are downsampled to 'points' points (largest-triangle buckets).
+    """
+    try:
+        ticker = (request.args.get('ticker') or '').strip()
+        if not ticker:
+            return jsonify({"error": "Please provide a ticker", "success": False}), 400
+        
+        result = chart_data(
+            quote_symbol(ticker),
+            period=request.args.get('period', '1y'),
+            interval=request.args.get('interval', '1d'),
+            points=int(request.args.get('points', 1000)),
+        )
+        return jsonify({"success": True, **result})
+    except ValueError as e:
+        return jsonify({"error": str(e), "success": False}), 400
+    except Exception as e:
+        logger.error(f"[API Error] Chart data failed: {str(e)}")
+        return jsonify({"error": str(e), "success": False}), 500
+
+@app.route('/live-indicators', methods=['GET'])
+def get_live_indicators():
+    """
+    Flask endpoint returning a ticker's latest EMA20, MACD, RSI, Bollinger bands
+    and 20/50 moving average cross, e.g. ?ticker=TCS. Indicator state is kept
+    between requests, so each call only processes the bars added since the last.
+    """
+    try:
+        ticker = (request.args.get('ticker') or '').strip()
+        if not ticker:
+            return jsonify({"error": "Please provide a ticker", "success": False}), 400
+        
+        symbol = quote_symbol(ticker)
+        result = live_indicators(symbol)
+        if result is None:
+            return jsonify({"error": f"No price history available for {symbol}", "success": False}), 404
+        return jsonify({"success": True, "ticker": symbol, **result})
+    except Exception as e:
+        logger.error(f"[API Error] Live indicators failed: {str(e)}")
+        return jsonify({"error": str(e), "success": False}), 500
+
 # =================== STATIC APIS ===================
 @app.route('/auto-bank-data', methods=['get'])
 def AutoBankData():
@@ -0,0 +1,69 @@
+import pandas as pd
+from helper.market_data import get_provider
+from helper.ttl_cache import market_cache
+
+# Upper bound on symbols per batch request
+MAX_BATCH_SIZE = 200
+
+
+def quote_symbol(ticker):
+    """Add the NSE suffix to bare symbols, leave exchange-qualified symbols and indices alone"""
+    ticker = ticker.strip().upper()
+    if "." in ticker or ticker.startswith("^"):
+        return ticker
+    return ticker + ".NS"
+
+
+def _quote_from_history(symbol, hist):
+    hist = hist.dropna(subset=["Close"])
+    if hist.empty:
+        return {"symbol": symbol, "error": "No price data available"}
+
+    price = float(hist["Close"].iloc[-1])
+    quote = {
+        "symbol": symbol,
+        "price": round(price, 2),
+        "previous_close": None,
+        "change": None,
+        "change_percent": None,
+        "volume": int(hist["Volume"].iloc[-1]) if pd.notna(hist["Volume"].iloc[-1]) else None,
+        "as_of": hist.index[-1].strftime("%Y-%m-%d"),
+    }
+    if len(hist) > 1:
+        prev_price = float(hist["Close"].iloc[-2])
+        quote["previous_close"] = round(prev_price, 2)
+        quote["change"] = round(price - prev_price, 2)
+        quote["change_percent"] = round((price - prev_price) / prev_price * 100, 2)
+    return quote
+
+
+def get_batch_quotes(tickers):
+    """
+    Last price, day change and volume for many tickers at once.
+    Symbols not in the quote cache are fetched together with a single
+    grouped download instead of one Ticker round trip each.
+    """
+    symbols = list(dict.fromkeys(quote_symbol(t) for t in tickers if t and t.strip()))
+    if len(symbols) > MAX_BATCH_SIZE:
+        raise ValueError(f"Too many tickers: {len(symbols)} (maximum {MAX_BATCH_SIZE})")
+
+    quotes = {}
+    for symbol in symbols:
+        cached = market_cache.get(("last_quote", symbol), "quote")
+        if cached is not None:
+            quotes[symbol] = cached
+
+    missing = [s for s in symbols if s not in quotes]
+    if missing:
+        # 5 days so there are always two sessions to compute the change from
+        frames = get_provider().download(missing, period="5d")
+        for symbol in missing:
+            try:
+                quote = _quote_from_history(symbol, frames[symbol])
+            except KeyError:
+                quote = {"symbol": symbol, "error": "No price data available"}
+            if "error" not in quote:
+                market_cache.set(("last_quote", symbol), quote, "quote")
+            quotes[symbol] = quote
+
+    return [quotes[s] for s in symbols]
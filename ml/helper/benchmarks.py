@@ -0,0 +1,97 @@
+import threading
+from datetime import datetime, timedelta
+import numpy as np
+import pandas as pd
+from helper import ohlcv_store
+from helper.market_data import slice_period
+from helper.ttl_cache import IST, NSE_CLOSE
+
+# Benchmark indices that reports and screens can compare against
+BENCHMARK_INDICES = {
+    "NIFTY 50": "^NSEI",
+    "NIFTY BANK": "^NSEBANK",
+    "NIFTY IT": "^CNXIT",
+    "NIFTY PHARMA": "^CNXPHARMA",
+    "NIFTY AUTO": "^CNXAUTO",
+    "NIFTY FMCG": "^CNXFMCG",
+    "NIFTY METAL": "^CNXMETAL",
+    "NIFTY ENERGY": "^CNXENERGY",
+    "NIFTY REALTY": "^CNXREALTY",
+}
+
+# Closest sectoral index for a Yahoo Finance sector
+SECTOR_BENCHMARKS = {
+    "Technology": "NIFTY IT",
+    "Financial Services": "NIFTY BANK",
+    "Healthcare": "NIFTY PHARMA",
+    "Consumer Cyclical": "NIFTY AUTO",
+    "Consumer Defensive": "NIFTY FMCG",
+    "Basic Materials": "NIFTY METAL",
+    "Energy": "NIFTY ENERGY",
+    "Real Estate": "NIFTY REALTY",
+}
+
+TRADING_DAYS_PER_YEAR = 252
+
+# name -> (session date, full daily history); shared by every report in the process
+_series = {}
+_lock = threading.Lock()
+
+
+def last_session(now=None):
+    """Date of the most recent completed NSE session (weekends skipped, holidays not tracked)"""
+    now = now or datetime.now(IST)
+    day = now.date() if now.time() >= NSE_CLOSE else now.date() - timedelta(days=1)
+    while day.weekday() >= 5:
+        day -= timedelta(days=1)
+    return day
+
+
+def sector_benchmark(sector):
+    """Benchmark name for a sector, falling back to NIFTY 50"""
+    return SECTOR_BENCHMARKS.get(sector, "NIFTY 50")
+
+
+def get_benchmark_history(name="NIFTY 50", period="1y"):
+    """
+    Daily history of a benchmark index, shared across reports and refreshed
+    once per trading day (on the first request after each session closes).
+    """
+    if name not in BENCHMARK_INDICES:
+        raise ValueError(f"Unknown benchmark: {name}")
+
+    session = last_session()
+    with _lock:
+        cached = _series.get(name)
+        if cached is None or cached[0] != session:
+            cached = _series[name] = (session, ohlcv_store.load(BENCHMARK_INDICES[name]))
+    return slice_period(cached[1], period)
+
+
+def relative_metrics(stock_close, benchmark_close):
+    """
+    Beta, annualised alpha, correlation and relative strength of a stock
+    against a benchmark, from their daily closes aligned on common dates.
+    """
+    closes = pd.concat([stock_close, benchmark_close], axis=1, join="inner").dropna()
+    if len(closes) < 20:
+        return {}
+
+    prices = closes.to_numpy(dtype=float)
+    returns = np.diff(prices, axis=0) / prices[:-1]
+    stock_returns, bench_returns = returns[:, 0], returns[:, 1]
+
+    bench_var = np.var(bench_returns, ddof=1)
+    beta = np.cov(stock_returns, bench_returns, ddof=1)[0, 1] / bench_var if bench_var > 0 else np.nan
+    alpha = (stock_returns.mean() - beta * bench_returns.mean()) * TRADING_DAYS_PER_YEAR * 100
+    stock_growth = prices[-1, 0] / prices[0, 0]
+    bench_growth = prices[-1, 1] / prices[0, 1]
+
+    return {
+        "beta": float(beta),
+        "alpha": float(alpha),
+        "correlation": float(np.corrcoef(stock_returns, bench_returns)[0, 1]),
+        # Ratio of growth multiples: above 1 means the stock outperformed
+        "relative_strength": float(stock_growth / bench_growth),
+        "outperformance": float((stock_growth - bench_growth) * 100),
+    }
@@ -0,0 +1,241 @@
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+import numpy as np
+
+# Rendered chart images are cached under a content address: the SHA-256 of the
+# chart kind, the renderer parameters (style version, image format) and every
+# value in the chart's payload, arrays included byte for byte. The same data
+# always produces the same image, so a second report for the same ticker and
+# day is assembled from cached images without drawing anything, while any new
+# bar, re-adjusted close or changed parameter produces a new key.
+#
+# The memory tier is an LRU bounded by CHART_CACHE_MB of image bytes. Setting
+# CHART_CACHE_DIR adds a disk tier (one file per image, shared by worker
+# processes and kept across restarts) bounded by CHART_CACHE_DISK_MB; the
+# least recently used files are removed when it grows past the limit. Each
+# process keeps an index of the files and their total size, updated as it
+# reads and writes them. The directory is rescanned, picking up files written
+# or removed by other processes, on first use, before every trim and after the
+# process has written DISK_RESYNC of the limit since the last scan. A trim
+# removes files down to DISK_LOW_WATER of the limit so rescans stay rare.
+MAX_BYTES = int(float(os.getenv("CHART_CACHE_MB", "64")) * 1024 * 1024)
+CACHE_DIR = os.getenv("CHART_CACHE_DIR")
+MAX_DISK_BYTES = int(float(os.getenv("CHART_CACHE_DISK_MB", "256")) * 1024 * 1024)
+DISK_RESYNC = 0.1
+DISK_LOW_WATER = 0.9
+
+
+def _feed(digest, value):
+    """Add `value` to the running hash, tagged with its type so e.g. 1 and "1" differ"""
+    if isinstance(value, dict):
+        digest.update(b"{%d" % len(value))
+        for name in sorted(value, key=str):
+            _feed(digest, str(name))
+            _feed(digest, value[name])
+    elif isinstance(value, (list, tuple)):
+        digest.update(b"[%d" % len(value))
+        for item in value:
+            _feed(digest, item)
+    elif isinstance(value, (np.ndarray, np.generic)):
+        values = np.ascontiguousarray(value)
+        if values.dtype == object:
+            _feed(digest, values.tolist())
+            return
+        digest.update(f"a{values.dtype.str}{values.shape}".encode("utf-8"))
+        digest.update(values.tobytes())
+    elif isinstance(value, (str, bytes)):
+        data = value.encode("utf-8") if isinstance(value, str) else value
+        digest.update(b"%s%d:" % (type(value).__name__.encode("ascii"), len(data)))
+        digest.update(data)
+    else:
+        # None, bool, int, float and other scalars with a stable repr
+        digest.update(f"{type(value).__name__}:{value!r};".encode("utf-8"))
+
+
+def chart_key(kind, payload, **params):
+    """Content address (hex SHA-256) of a chart of `kind` drawn from `payload` with `params`"""
+    digest = hashlib.sha256()
+    _feed(digest, kind)
+    _feed(digest, params)
+    _feed(digest, payload)
+    return digest.hexdigest()
+
+
+class ChartCache:
+    """
+    Two-tier cache of rendered chart images keyed by chart_key(): an in-memory
+    LRU and an optional directory of image files, both bounded by total bytes.
+    """
+
+    def __init__(self, max_bytes=MAX_BYTES, directory=CACHE_DIR, max_disk_bytes=MAX_DISK_BYTES):
+        self.max_bytes = max_bytes
+        self.directory = directory
+        self.max_disk_bytes = max_disk_bytes
+        self._entries = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+        self._disk_lock = threading.Lock()
+        self._disk_files = None
+        self._disk_size = 0
+        self._disk_written = 0
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.disk_evictions = 0
+
+    def _path(self, key):
+        return os.path.join(self.directory, key[:2], f"{key}.img")
+
+    def _remember(self, key, image):
+        if len(image) > self.max_bytes:
+            return
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._size -= len(previous)
+            self._entries[key] = image
+            self._size += len(image)
+            while self._size > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self._size -= len(evicted)
+                self.evictions += 1
+
+    def _load_disk_index(self):
+        """Files of the disk tier, least recently used first, scanned on first use (caller holds the disk lock)"""
+        if self._disk_files is None:
+            self._scan_disk()
+        return self._disk_files
+
+    def _scan_disk(self):
+        """Rebuild the disk tier's index from the directory (caller holds the disk lock)"""
+        files = []
+        for root, _, names in os.walk(self.directory):
+            for name in names:
+                if name.endswith(".img"):
+                    try:
+                        stat = os.stat(os.path.join(root, name))
+                    except OSError:
+                        continue
+                    files.append((stat.st_mtime, os.path.join(root, name), stat.st_size))
+        self._disk_files = OrderedDict((path, size) for _, path, size in sorted(files))
+        self._disk_size = sum(self._disk_files.values())
+        self._disk_written = 0
+
+    def _read_disk(self, key):
+        if not self.directory:
+            return None
+        path = self._path(key)
+        try:
+            with open(path, "rb") as f:
+                image = f.read()
+            # Mark as recently used for the disk tier's eviction order (and across restarts)
+            os.utime(path)
+        except FileNotFoundError:
+            return None
+        except OSError as e:
+            print(f"Ignoring unreadable chart cache file {path}: {str(e)}")
+            return None
+        with self._disk_lock:
+            files = self._load_disk_index()
+            if path in files:
+                files.move_to_end(path)
+            else:
+                # Written by another worker process since the last scan
+                files[path] = len(image)
+                self._disk_size += len(image)
+        return image
+
+    def _write_disk(self, key, image):
+        if not self.directory:
+            return
+        try:
+            path = self._path(key)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+            with open(tmp, "wb") as f:
+                f.write(image)
+            os.replace(tmp, path)
+        except OSError as e:
+            print(f"Could not write chart cache file: {str(e)}")
+            return
+        with self._disk_lock:
+            files = self._load_disk_index()
+            self._disk_size += len(image) - files.pop(path, 0)
+            files[path] = len(image)
+            self._disk_written += len(image)
+            if self._disk_written > self.max_disk_bytes * DISK_RESYNC:
+                self._scan_disk()
+            if self._disk_size > self.max_disk_bytes:
+                self._trim_disk()
+
+    def _trim_disk(self):
+        """
+        Remove the least recently used files down to the low-water mark (caller
+        holds the disk lock). Rescans first so files of other processes count.
+        """
+        self._scan_disk()
+        files = self._disk_files
+        while self._disk_size > self.max_disk_bytes * DISK_LOW_WATER and files:
+            path, size = files.popitem(last=False)
+            self._disk_size -= size
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                # Already evicted by another worker process
+                continue
+            except OSError:
+                continue
+            self.disk_evictions += 1
+
+    def get(self, key):
+        """Cached image bytes for `key`, or None"""
+        with self._lock:
+            image = self._entries.get(key)
+            if image is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return image
+        image = self._read_disk(key)
+        with self._lock:
+            if image is None:
+                self.misses += 1
+                return None
+            self.disk_hits += 1
+        self._remember(key, image)
+        return image
+
+    def put(self, key, image):
+        """Store rendered image bytes under `key` in both tiers"""
+        self._remember(key, image)
+        self._write_disk(key, image)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._size = 0
+
+    def stats(self):
+        with self._disk_lock:
+            disk_bytes = self._disk_size
+        with self._lock:
+            lookups = self.hits + self.disk_hits + self.misses
+            return {
+                "size": len(self._entries),
+                "bytes": self._size,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "hit_rate": (self.hits + self.disk_hits) / lookups if lookups else 0.0,
+                "evictions": self.evictions,
+                "disk_evictions": self.disk_evictions,
+                "disk_bytes": disk_bytes,
+                "disk_tier": bool(self.directory),
+            }
+
+
+# Shared cache for report chart images
+chart_cache = ChartCache()
@@ -0,0 +1,56 @@
+import numpy as np
+from helper.downsample import crossings, downsample
+from helper.indicators import sma
+from helper.market_snapshot import MarketSnapshot
+
+# Price series for client-side charts (the /chart-data endpoint): close and
+# 50/200-bar moving averages, reduced with LTTB to the number of points the
+# client asks for.
+
+DEFAULT_POINTS = 1000
+MAX_POINTS = 5000
+
+
+def _json_values(values):
+    return [None if np.isnan(v) else round(float(v), 4) for v in values]
+
+
+def chart_data(symbol, period="1y", interval="1d", points=DEFAULT_POINTS):
+    """
+    Close and 50/200-bar moving averages of `symbol` over a yfinance-style
+    period, downsampled to about `points` points for a client-side chart.
+    The period's high and low and the 50/200 crossovers are always included.
+    """
+    points = int(points)
+    if not 3 <= points <= MAX_POINTS:
+        raise ValueError(f"points must be between 3 and {MAX_POINTS}")
+    snapshot = MarketSnapshot(symbol)
+    full = snapshot.history("max", interval)
+    frame = snapshot.history(period, interval)
+    if frame.empty:
+        raise ValueError(f"No price history available for {symbol}")
+
+    # Moving averages warmed up on the full history, then cut to the period
+    closes = full['Close'].to_numpy(dtype=float)
+    offset = len(full) - len(frame)
+    close = closes[offset:]
+    ma50, ma200 = sma(closes, 50)[offset:], sma(closes, 200)[offset:]
+
+    dates = frame.index.tz_localize(None) if frame.index.tz is not None else frame.index
+    dates = dates.values.astype("datetime64[D]")
+    high, low = int(np.argmax(close)), int(np.argmin(close))
+    keep = np.concatenate([[high, low], crossings(ma50, ma200)])
+    rows = downsample(dates, close, points, keep)
+    return {
+        "ticker": symbol,
+        "period": period,
+        "interval": interval,
+        "total_points": len(close),
+        "points": len(rows),
+        "dates": [str(d) for d in dates[rows]],
+        "close": _json_values(close[rows]),
+        "ma50": _json_values(ma50[rows]),
+        "ma200": _json_values(ma200[rows]),
+        "high": {"date": str(dates[high]), "close": round(float(close[high]), 4)},
+        "low": {"date": str(dates[low]), "close": round(float(close[low]), 4)},
+    }
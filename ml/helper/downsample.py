@@ -0,0 +1,74 @@
+import numpy as np
+
+# Largest-Triangle-Three-Buckets (LTTB) downsampling for line charts. A chart
+# can only show about one point per horizontal pixel, so long histories (10
+# years, "max") are reduced to the plot's pixel width before plotting or
+# sending to a client. LTTB keeps the points that most change the line's
+# shape, so peaks and troughs survive; indices passed as `keep` (all-time
+# high, moving average crossovers, event markers) are always retained.
+
+
+def _as_float(x):
+    x = np.asarray(x)
+    if np.issubdtype(x.dtype, np.datetime64):
+        x = x.astype("datetime64[ns]").astype(np.int64)
+    return x.astype(np.float64)
+
+
+def lttb(x, y, n_out):
+    """
+    Indices of the `n_out` points of (x, y) chosen by LTTB, always including
+    the first and last point. Returns every index when n_out >= len(y).
+    """
+    x, y = _as_float(x), np.asarray(y, dtype=np.float64)
+    n = len(y)
+    if n_out >= n or n <= 2:
+        return np.arange(n)
+    n_out = max(n_out, 3)
+
+    # Bucket edges for the n - 2 inner points and each bucket's centroid
+    edges = (np.arange(n_out - 1) * ((n - 2) / (n_out - 2))).astype(np.int64) + 1
+    edges[-1] = n - 1
+    counts = np.diff(edges)
+    y_filled = np.where(np.isnan(y), np.nanmean(y), y)
+    avg_x = np.add.reduceat(x[:-1], edges[:-1]) / counts
+    avg_y = np.add.reduceat(y_filled[:-1], edges[:-1]) / counts
+    # The last bucket's "next bucket" is the final point
+    avg_x = np.append(avg_x, x[-1])
+    avg_y = np.append(avg_y, y_filled[-1])
+
+    chosen = np.empty(n_out, dtype=np.int64)
+    chosen[0], chosen[-1] = 0, n - 1
+    a = 0
+    for i in range(n_out - 2):
+        start, end = edges[i], edges[i + 1]
+        # Twice the area of the triangle (previous pick, candidate, next centroid)
+        area = np.abs((x[a] - avg_x[i + 1]) * (y_filled[start:end] - y_filled[a])
+                      - (x[a] - x[start:end]) * (avg_y[i + 1] - y_filled[a]))
+        a = start + int(np.argmax(area))
+        chosen[i + 1] = a
+    return chosen
+
+
+def crossings(a, b):
+    """Indices on both sides of every bar where `a` crosses `b` (NaNs never cross)"""
+    a, b = np.asarray(a, dtype=np.float64), np.asarray(b, dtype=np.float64)
+    sign = np.sign(a - b)
+    hits = np.flatnonzero((sign[:-1] * sign[1:]) < 0)
+    return np.union1d(hits, hits + 1)
+
+
+def downsample(x, y, n_out, keep=()):
+    """
+    Sorted indices of at most about `n_out` points of (x, y): the LTTB picks
+    plus every index in `keep`. The budget for LTTB is reduced by the number
+    of kept indices so the total stays close to `n_out`.
+    """
+    n = len(y)
+    keep = np.unique(np.asarray(keep, dtype=np.int64))
+    keep = keep[(keep >= 0) & (keep < n)]
+    if n_out >= n:
+        return np.arange(n)
+    picks = lttb(x, y, max(3, n_out - len(keep)))
+    return np.union1d(picks, keep)
+
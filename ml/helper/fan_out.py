@@ -0,0 +1,79 @@
+import logging
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeoutError
+
+# Shared, bounded pool for independent network-bound data gathering calls.
+# Concurrent requests share its workers, so a call may wait in the queue before
+# it starts; its timeout is counted from when it starts running. Time spent
+# queued is bounded separately (by the same number of seconds) so a pool kept
+# busy by hung calls cannot block a request forever.
+MAX_WORKERS = int(os.getenv("FAN_OUT_WORKERS", "8"))
+CALL_TIMEOUT = float(os.getenv("FAN_OUT_TIMEOUT", "30"))
+_pool = ThreadPoolExecutor(max_workers=MAX_WORKERS, thread_name_prefix="fan-out")
+
+logger = logging.getLogger(__name__)
+
+
+class _Call:
+    """A submitted callable that records when a worker starts running it"""
+
+    def __init__(self, fn):
+        self.fn = fn
+        self.started = None
+        self.running = threading.Event()
+
+    def __call__(self):
+        self.started = time.monotonic()
+        self.running.set()
+        return self.fn()
+
+
+def _result(future, call, limit):
+    """Result of `future`, allowing `limit` seconds in the queue and `limit` seconds running"""
+    if not call.running.wait(limit) and future.cancel():
+        raise FutureTimeoutError()
+    call.running.wait()
+    remaining = call.started + limit - time.monotonic()
+    return future.result(timeout=max(remaining, 0))
+
+
+def fan_out(calls, timeout=CALL_TIMEOUT, timeouts=None, fallbacks=None):
+    """
+    Run independent zero-argument callables concurrently and collect their results.
+
+    calls:     {name: callable}
+    timeout:   default seconds each call may take, counted from when it starts
+    timeouts:  optional per-call overrides {name: seconds}
+    fallbacks: optional {name: value} returned instead when that call fails or
+               times out; calls without a fallback re-raise their error
+
+    Returns {name: result}. Wall-clock time is that of the slowest call. A call
+    that times out keeps running in its worker thread but is no longer waited on.
+    """
+    timeouts = timeouts or {}
+    fallbacks = fallbacks or {}
+    submitted = {}
+    for name, fn in calls.items():
+        call = _Call(fn)
+        submitted[name] = (_pool.submit(call), call)
+
+    results = {}
+    for name, (future, call) in submitted.items():
+        limit = timeouts.get(name, timeout)
+        try:
+            results[name] = _result(future, call, limit)
+        except FutureTimeoutError:
+            state = "timed out after" if call.started is not None else "did not start within"
+            logger.warning(f"{name} {state} {limit}s")
+            if name not in fallbacks:
+                raise TimeoutError(f"{name} {state} {limit}s")
+            results[name] = fallbacks[name]
+        except Exception as e:
+            if name not in fallbacks:
+                raise
+            logger.warning(f"{name} failed: {str(e)}")
+            results[name] = fallbacks[name]
+    return results
@@ -1,20 +1,20 @@
-import yfinance as yf
+from helper.market_snapshot import MarketSnapshot, nse_symbol
 
 # Fetch financial statements from Yahoo Finance
-def get_financial_statements(ticker):
+def get_financial_statements(ticker, snapshot=None):
     """
     Retrieves and formats comprehensive financial statements for a given stock ticker.
     Returns well-structured data with key financial metrics highlighted for LLM analysis.
+    Pass a MarketSnapshot to reuse data already fetched for the same request.
     """
-    if "." in ticker:
-        ticker = ticker.split(".")[0]
-    ticker = ticker + ".NS"
+    ticker = nse_symbol(ticker)
     
-    company = yf.Ticker(ticker)
+    if snapshot is None:
+        snapshot = MarketSnapshot(ticker)
     
     # Get company information
     try:
-        company_info = company.info
+        company_info = snapshot.info
         company_name = company_info.get('longName', company_info.get('shortName', ticker))
         sector = company_info.get('sector', 'N/A')
         industry = company_info.get('industry', 'N/A')
@@ -25,9 +25,9 @@ def get_financial_statements(ticker):
         summary = ''
     
     # Get financial statements
-    balance_sheet = company.balance_sheet
-    income_stmt = company.income_stmt
-    cash_flow = company.cashflow
+    balance_sheet = snapshot.balance_sheet
+    income_stmt = snapshot.income_stmt
+    cash_flow = snapshot.cashflow
     
     # Format balance sheet (keep up to 3 years of data)
     if balance_sheet.shape[1] >= 3:
@@ -133,7 +133,7 @@ def get_financial_statements(ticker):
                 
                 try:
                     # Try to get current stock price
-                    current_price = company.info.get('currentPrice', company.history(period="1d")['Close'].iloc[-1])
+                    current_price = snapshot.info.get('currentPrice') or snapshot.history("1mo")['Close'].iloc[-1]
                     pe_ratio = current_price / eps
                     output += f" | P/E Ratio: {pe_ratio:.2f}\n"
                 except:
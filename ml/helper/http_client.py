@@ -0,0 +1,125 @@
+import asyncio
+import atexit
+import os
+import threading
+from urllib.parse import urlparse
+import aiohttp
+
+# Connection pool and timeout settings shared by every HTTP fetcher
+TIMEOUT_SECONDS = float(os.getenv("HTTP_TIMEOUT", "10"))
+MAX_CONNECTIONS = int(os.getenv("HTTP_MAX_CONNECTIONS", "100"))
+PER_HOST_CONNECTIONS = int(os.getenv("HTTP_PER_HOST_CONNECTIONS", "10"))
+
+# Stricter concurrency for hosts that throttle scrapers
+HOST_LIMITS = {
+    "www.google.com": 2,
+}
+
+DEFAULT_HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/102.0.0.0 Safari/537.36',
+}
+
+
+class AsyncHttpClient:
+    """
+    asyncio HTTP client with a keep-alive connection pool, per-host
+    concurrency limits and request timeouts. Create one per event loop:
+
+        async with AsyncHttpClient() as client:
+            pages = await asyncio.gather(*(client.get_text(url) for url in urls))
+    """
+
+    def __init__(self, max_connections=MAX_CONNECTIONS, per_host=PER_HOST_CONNECTIONS,
+                 timeout=TIMEOUT_SECONDS, host_limits=None):
+        self.max_connections = max_connections
+        self.per_host = per_host
+        self.timeout = timeout
+        self.host_limits = HOST_LIMITS if host_limits is None else host_limits
+        self._session = None
+        self._semaphores = {}
+
+    def _ensure_session(self):
+        if self._session is None or self._session.closed:
+            connector = aiohttp.TCPConnector(
+                limit=self.max_connections,
+                limit_per_host=self.per_host,
+                ttl_dns_cache=300,
+                keepalive_timeout=60,
+            )
+            self._session = aiohttp.ClientSession(
+                connector=connector,
+                timeout=aiohttp.ClientTimeout(total=self.timeout),
+                headers=DEFAULT_HEADERS,
+            )
+        return self._session
+
+    def _semaphore(self, url):
+        host = urlparse(url).hostname
+        if host not in self._semaphores:
+            self._semaphores[host] = asyncio.Semaphore(self.host_limits.get(host, self.per_host))
+        return self._semaphores[host]
+
+    async def request(self, url, params=None, headers=None, as_json=False):
+        session = self._ensure_session()
+        async with self._semaphore(url):
+            async with session.get(url, params=params, headers=headers) as response:
+                response.raise_for_status()
+                if as_json:
+                    return await response.json(content_type=None)
+                return await response.text()
+
+    async def get_text(self, url, params=None, headers=None):
+        return await self.request(url, params=params, headers=headers)
+
+    async def get_json(self, url, params=None, headers=None):
+        return await self.request(url, params=params, headers=headers, as_json=True)
+
+    async def close(self):
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.close()
+
+
+# Synchronous bridge for Flask handlers and agent tools: one background event
+# loop owns a shared client, so every caller reuses the same connection pool.
+_loop = None
+_loop_lock = threading.Lock()
+shared_client = AsyncHttpClient()
+
+
+def _background_loop():
+    global _loop
+    with _loop_lock:
+        if _loop is None:
+            _loop = asyncio.new_event_loop()
+            threading.Thread(target=_loop.run_forever, name="http-client", daemon=True).start()
+    return _loop
+
+
+def _close_shared_client():
+    if _loop is not None:
+        run(shared_client.close(), timeout=5)
+
+
+atexit.register(_close_shared_client)
+
+
+def run(coro, timeout=None):
+    """Run a coroutine on the shared background loop and wait for its result"""
+    future = asyncio.run_coroutine_threadsafe(coro, _background_loop())
+    return future.result(timeout)
+
+
+def fetch_text(url, params=None, headers=None):
+    """Blocking GET returning the response body, over the shared connection pool"""
+    return run(shared_client.get_text(url, params=params, headers=headers))
+
+
+def fetch_json(url, params=None, headers=None):
+    """Blocking GET returning the decoded JSON body, over the shared connection pool"""
+    return run(shared_client.get_json(url, params=params, headers=headers))
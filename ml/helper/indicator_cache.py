@@ -0,0 +1,158 @@
+import hashlib
+import json
+import os
+import threading
+from collections import OrderedDict
+import numpy as np
+from helper import ohlcv_store
+from helper.single_flight import SingleFlight
+
+# Computed indicators can only change when a new bar arrives (or the forming
+# bar's close moves), so results are cached under a key made of the ticker,
+# the series label, the indicator parameters and the last bar's timestamp and
+# close. Entries are (arrays, summary) pairs: a dict of NumPy arrays aligned
+# with the input series and a dict of JSON-serialisable scalars.
+#
+# The memory tier is an LRU bounded by INDICATOR_CACHE_SIZE entries. Setting
+# INDICATOR_CACHE_DIR adds a disk tier (one .npz per entry) that survives
+# restarts and is shared by worker processes.
+MAX_ENTRIES = int(os.getenv("INDICATOR_CACHE_SIZE", "256"))
+CACHE_DIR = os.getenv("INDICATOR_CACHE_DIR")
+
+_SUMMARY = "__summary__"
+
+
+def indicator_key(ticker, frame, label, params=None):
+    """Cache key for indicators computed over `frame` (a price history DataFrame)"""
+    if frame.empty:
+        return (ticker, label, json.dumps(params or {}, sort_keys=True), None, None, 0)
+    return (
+        ticker,
+        label,
+        json.dumps(params or {}, sort_keys=True, default=str),
+        frame.index[-1].isoformat(),
+        float(frame['Close'].iloc[-1]),
+        len(frame),
+    )
+
+
+def _freeze(arrays):
+    """Share cached arrays read-only so no caller can alter another's result"""
+    frozen = {}
+    for name, values in arrays.items():
+        values = np.asarray(values)
+        values.setflags(write=False)
+        frozen[name] = values
+    return frozen
+
+
+class IndicatorCache:
+    """
+    Two-tier cache of indicator results: an in-memory LRU and an optional
+    directory of .npz files. Concurrent misses for the same key compute once.
+    """
+
+    def __init__(self, maxsize=MAX_ENTRIES, directory=CACHE_DIR):
+        self.maxsize = maxsize
+        self.directory = directory
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._flights = SingleFlight()
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def _path(self, key):
+        digest = hashlib.sha256(repr(key).encode("utf-8")).hexdigest()
+        return os.path.join(self.directory, f"{digest}.npz")
+
+    def _remember(self, key, entry):
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def _read_disk(self, key):
+        if not self.directory:
+            return None
+        path = self._path(key)
+        if not os.path.exists(path):
+            return None
+        try:
+            with np.load(path, allow_pickle=False) as data:
+                summary = json.loads(str(data[_SUMMARY]))
+                arrays = {name: data[name] for name in data.files if name != _SUMMARY}
+            return _freeze(arrays), summary
+        except (OSError, ValueError, KeyError) as e:
+            print(f"Ignoring unreadable indicator cache file {path}: {str(e)}")
+            return None
+
+    def _write_disk(self, key, arrays, summary):
+        if not self.directory:
+            return
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            payload = {**arrays, _SUMMARY: np.array(json.dumps(summary, default=float))}
+            ohlcv_store.save_atomic(self._path(key), lambda f: np.savez(f, **payload))
+        except OSError as e:
+            print(f"Could not write indicator cache file: {str(e)}")
+
+    def get(self, key):
+        """Cached (arrays, summary) for `key`, or None"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry
+        entry = self._read_disk(key)
+        if entry is not None:
+            with self._lock:
+                self.disk_hits += 1
+            self._remember(key, entry)
+        return entry
+
+    def get_or_compute(self, key, compute):
+        """
+        Return the cached (arrays, summary) for `key`, calling `compute()` on a miss.
+        `compute` must return (dict of arrays, dict of JSON-serialisable scalars).
+        """
+        entry = self.get(key)
+        if entry is not None:
+            return entry
+
+        def compute_and_store():
+            arrays, summary = compute()
+            entry = (_freeze(arrays), summary)
+            with self._lock:
+                self.misses += 1
+            self._remember(key, entry)
+            self._write_disk(key, entry[0], summary)
+            return entry
+
+        return self._flights.do(key, compute_and_store)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.disk_hits + self.misses
+            return {
+                "size": len(self._entries),
+                "maxsize": self.maxsize,
+                "hits": self.hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "hit_rate": (self.hits + self.disk_hits) / lookups if lookups else 0.0,
+                "evictions": self.evictions,
+                "disk_tier": bool(self.directory),
+            }
+
+
+# Shared cache for report and analysis indicators
+indicator_cache = IndicatorCache()
@@ -0,0 +1,142 @@
+import numpy as np
+
+# Technical indicators computed with NumPy over arrays of closes (and volumes).
+# Every function works along the last axis, so the same code handles a single
+# ticker (shape (n,)) or a whole universe of tickers (shape (tickers, n)).
+# Results match the pandas rolling/ewm formulas they replace: rolling windows
+# are NaN until full (and wherever the window contains a NaN), EMAs use
+# adjust=False, RSI uses simple 14-day averages of gains and losses.
+
+DEFAULT_PARAMS = {
+    "ma_windows": (7, 20, 50, 200),
+    "rsi_window": 14,
+    "macd_fast": 12,
+    "macd_slow": 26,
+    "macd_signal": 9,
+    "bollinger_window": 20,
+    "bollinger_std": 2,
+    "volume_ma_window": 20,
+}
+
+
+def _as_float(values):
+    return np.asarray(values, dtype=np.float64)
+
+
+def _prefix_sums(values):
+    """Prefix sums of values, squared values and valid counts (NaNs count as missing)"""
+    valid = ~np.isnan(values)
+    filled = np.where(valid, values, 0.0)
+    pad = [(0, 0)] * (values.ndim - 1) + [(1, 0)]
+    return (
+        np.pad(np.cumsum(filled, axis=-1), pad),
+        np.pad(np.cumsum(filled * filled, axis=-1), pad),
+        np.pad(np.cumsum(valid, axis=-1), pad),
+    )
+
+
+def _window_diff(prefix, window):
+    """Sum over each trailing window from a prefix sum array (first window-1 positions are 0)"""
+    out = np.zeros(prefix.shape[:-1] + (prefix.shape[-1] - 1,))
+    if window <= out.shape[-1]:
+        out[..., window - 1:] = prefix[..., window:] - prefix[..., :-window]
+    return out
+
+
+def _rolling(values, window, prefix=None, std=False, ddof=1):
+    """Rolling mean (or sample std) from shared prefix sums"""
+    values = _as_float(values)
+    sums, squares, counts = prefix if prefix is not None else _prefix_sums(values)
+    total = _window_diff(sums, window)
+    full = _window_diff(counts, window) == window
+    mean = total / window
+    if not std:
+        return np.where(full, mean, np.nan)
+    sq_total = _window_diff(squares, window)
+    var = (sq_total - window * mean * mean) / (window - ddof)
+    return np.where(full, np.sqrt(np.maximum(var, 0.0)), np.nan)
+
+
+def sma(values, window, prefix=None):
+    """Simple moving average over `window` bars"""
+    return _rolling(values, window, prefix)
+
+
+def rolling_std(values, window, prefix=None):
+    """Sample standard deviation over `window` bars (ddof=1, like pandas)"""
+    return _rolling(values, window, prefix, std=True)
+
+
+def ema(values, span):
+    """Exponential moving average with adjust=False; NaNs carry the previous value forward"""
+    values = _as_float(values)
+    alpha = 2.0 / (span + 1.0)
+    out = np.empty_like(values)
+    prev = np.full(values.shape[:-1], np.nan)
+    for i in range(values.shape[-1]):
+        x = values[..., i]
+        prev = np.where(np.isnan(prev), x, np.where(np.isnan(x), prev, alpha * x + (1 - alpha) * prev))
+        out[..., i] = prev
+    return out
+
+
+def rsi(close, window=14):
+    """Relative Strength Index from simple averages of gains and losses"""
+    close = _as_float(close)
+    # The first bar has no previous close: count it as a zero change, like pandas' where(delta > 0, 0)
+    delta = np.diff(close, axis=-1, prepend=close[..., :1])
+    gain = np.where(delta > 0, delta, np.where(np.isnan(delta), np.nan, 0.0))
+    loss = np.where(delta < 0, -delta, np.where(np.isnan(delta), np.nan, 0.0))
+    with np.errstate(divide="ignore", invalid="ignore"):
+        rs = sma(gain, window) / sma(loss, window)
+        return 100 - (100 / (1 + rs))
+
+
+def macd(close, fast=12, slow=26, signal=9):
+    """MACD line, signal line and histogram"""
+    line = ema(close, fast) - ema(close, slow)
+    signal_line = ema(line, signal)
+    return line, signal_line, line - signal_line
+
+
+def bollinger(close, window=20, num_std=2, prefix=None):
+    """Bollinger middle, upper and lower bands"""
+    close = _as_float(close)
+    prefix = prefix if prefix is not None else _prefix_sums(close)
+    mid = sma(close, window, prefix)
+    band = rolling_std(close, window, prefix) * num_std
+    return mid, mid + band, mid - band
+
+
+def compute_indicators(close, volume=None, params=None):
+    """
+    The full indicator set in one pass over `close` (and `volume`).
+    Returns a dict of arrays aligned with the input:
+      ma<N> for each moving-average window, rsi, macd, macd_signal, macd_hist,
+      bb_mid, bb_upper, bb_lower and, when volume is given, vol_ma<N>.
+    Callers slice the arrays (e.g. [..., -130:]) instead of recomputing on a tail.
+    """
+    p = dict(DEFAULT_PARAMS, **(params or {}))
+    close = _as_float(close)
+    prefix = _prefix_sums(close)
+
+    result = {}
+    for window in p["ma_windows"]:
+        result[f"ma{window}"] = sma(close, window, prefix)
+    result["rsi"] = rsi(close, p["rsi_window"])
+    result["macd"], result["macd_signal"], result["macd_hist"] = macd(
+        close, p["macd_fast"], p["macd_slow"], p["macd_signal"]
+    )
+    result["bb_mid"], result["bb_upper"], result["bb_lower"] = bollinger(
+        close, p["bollinger_window"], p["bollinger_std"], prefix
+    )
+    if volume is not None:
+        result[f"vol_ma{p['volume_ma_window']}"] = sma(volume, p["volume_ma_window"])
+    return result
+
+
+def last_valid(values):
+    """Last element of a 1-D indicator array as a float, or None if it is NaN"""
+    if len(values) == 0 or np.isnan(values[-1]):
+        return None
+    return float(values[-1])
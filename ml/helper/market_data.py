@@ -0,0 +1,215 @@
+import json
+import os
+import re
+import sys
+import numpy as np
+import pandas as pd
+
+# Every Yahoo Finance call in the data layer goes through a MarketDataProvider.
+# The live backend wraps yfinance; the replay backend serves payloads recorded
+# with record_fixtures() so reports and agent tools can be benchmarked offline.
+#
+# Select the backend with MARKET_DATA_PROVIDER=yfinance|replay; the replay
+# backend reads MARKET_DATA_FIXTURES (default ml/fixtures). When replaying,
+# point OHLCV_STORE_DIR at a scratch directory so the local store is not
+# filled with recorded data.
+FIXTURES_DIR = os.getenv(
+    "MARKET_DATA_FIXTURES",
+    os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "fixtures"),
+)
+STATEMENTS = ("balance_sheet", "income_stmt", "cashflow")
+
+
+def slice_period(frame, period):
+    """
+    Rows of `frame` covered by a yfinance-style period (5d, 1mo, 1y, ytd, max, ...).
+    Day periods count trading sessions like Yahoo does; the rest are calendar
+    windows ending now. The result is a row slice (a view) of `frame`.
+    """
+    if period in (None, "max") or frame.empty:
+        return frame
+
+    now = pd.Timestamp.now(tz=frame.index.tz)
+    if period == "ytd":
+        cutoff = pd.Timestamp(year=now.year, month=1, day=1, tz=frame.index.tz)
+    else:
+        match = re.match(r"^(\d+)(d|wk|w|mo|m|y)$", period)
+        if not match:
+            raise ValueError(f"Unsupported period: {period}")
+        count, unit = int(match.group(1)), match.group(2)
+        if unit == "d":
+            return frame.iloc[-count:]
+        if unit in ("wk", "w"):
+            offset = pd.DateOffset(weeks=count)
+        elif unit in ("mo", "m"):
+            offset = pd.DateOffset(months=count)
+        else:
+            offset = pd.DateOffset(years=count)
+        cutoff = (now - offset).normalize()
+    return frame.iloc[frame.index.searchsorted(cutoff):]
+
+
+class MarketDataProvider:
+    """Interface for market data backends"""
+
+    def info(self, symbol):
+        """Company profile and quote fields (yfinance `.info`)"""
+        raise NotImplementedError
+
+    def history(self, symbol, period=None, start=None):
+        """Daily OHLCV history (with Dividends/Stock Splits) for a period or from a start date"""
+        raise NotImplementedError
+
+    def statement(self, symbol, name):
+        """One of the annual financial statements: balance_sheet, income_stmt or cashflow"""
+        raise NotImplementedError
+
+    def download(self, symbols, period):
+        """Daily history for many symbols at once, as {symbol: DataFrame}"""
+        return {symbol: self.history(symbol, period=period) for symbol in symbols}
+
+
+class YFinanceProvider(MarketDataProvider):
+    """Live Yahoo Finance backend"""
+
+    def __init__(self):
+        import yfinance as yf
+        self.yf = yf
+
+    def info(self, symbol):
+        return self.yf.Ticker(symbol).info
+
+    def history(self, symbol, period=None, start=None):
+        if start is not None:
+            return self.yf.Ticker(symbol).history(start=start)
+        return self.yf.Ticker(symbol).history(period=period or "max")
+
+    def statement(self, symbol, name):
+        if name not in STATEMENTS:
+            raise ValueError(f"Unknown statement: {name}")
+        return getattr(self.yf.Ticker(symbol), name)
+
+    def download(self, symbols, period):
+        # One grouped request for all symbols instead of a round trip each
+        data = self.yf.download(symbols, period=period, group_by="ticker", threads=True, progress=False, auto_adjust=True)
+        frames = {}
+        for symbol in symbols:
+            try:
+                frames[symbol] = data[symbol] if isinstance(data.columns, pd.MultiIndex) else data
+            except KeyError:
+                frames[symbol] = pd.DataFrame()
+        return frames
+
+
+# Fixture (de)serialisation: plain JSON so recordings are diffable and portable
+def _label_to_json(label):
+    return label.isoformat() if isinstance(label, pd.Timestamp) else label
+
+
+def _frame_to_json(frame):
+    return {
+        "index": [_label_to_json(x) for x in frame.index],
+        "index_is_date": isinstance(frame.index, pd.DatetimeIndex),
+        "tz": str(frame.index.tz) if getattr(frame.index, "tz", None) is not None else None,
+        "columns": [_label_to_json(x) for x in frame.columns],
+        "columns_are_dates": isinstance(frame.columns, pd.DatetimeIndex),
+        "data": [[None if pd.isna(v) else v for v in row] for row in frame.to_numpy(dtype=object).tolist()],
+    }
+
+
+def _frame_from_json(payload):
+    index = payload["index"]
+    if payload["index_is_date"]:
+        index = pd.DatetimeIndex(pd.to_datetime(index, utc=True), name="Date")
+        index = index.tz_convert(payload["tz"]) if payload["tz"] else index.tz_localize(None)
+    columns = pd.to_datetime(payload["columns"]) if payload["columns_are_dates"] else payload["columns"]
+    data = np.array(payload["data"], dtype=float) if payload["data"] else None
+    return pd.DataFrame(data, index=index, columns=columns)
+
+
+class ReplayProvider(MarketDataProvider):
+    """
+    Serves payloads recorded by record_fixtures() from <fixtures_dir>/<SYMBOL>/.
+    History is recorded once (period=max) and sliced per request.
+    """
+
+    def __init__(self, fixtures_dir=FIXTURES_DIR):
+        self.fixtures_dir = fixtures_dir
+        self._frames = {}
+
+    def _path(self, symbol, name):
+        return os.path.join(self.fixtures_dir, symbol.replace("^", "_"), f"{name}.json")
+
+    def _load(self, symbol, name):
+        path = self._path(symbol, name)
+        if not os.path.exists(path):
+            raise LookupError(f"No recorded {name} for {symbol} in {self.fixtures_dir}")
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+
+    def _frame(self, symbol, name):
+        if (symbol, name) not in self._frames:
+            self._frames[symbol, name] = _frame_from_json(self._load(symbol, name))
+        return self._frames[symbol, name]
+
+    def info(self, symbol):
+        return self._load(symbol, "info")
+
+    def history(self, symbol, period=None, start=None):
+        frame = self._frame(symbol, "history")
+        if start is not None:
+            return frame.loc[frame.index >= pd.Timestamp(start, tz=frame.index.tz)]
+        return slice_period(frame, period)
+
+    def statement(self, symbol, name):
+        if name not in STATEMENTS:
+            raise ValueError(f"Unknown statement: {name}")
+        return self._frame(symbol, name)
+
+
+def record_fixtures(symbols, fixtures_dir=FIXTURES_DIR, provider=None):
+    """Record .info, full daily history and statements for `symbols` for later replay"""
+    provider = provider or YFinanceProvider()
+    for symbol in symbols:
+        target = os.path.join(fixtures_dir, symbol.replace("^", "_"))
+        os.makedirs(target, exist_ok=True)
+        payloads = {"history": _frame_to_json(provider.history(symbol, period="max"))}
+        try:
+            payloads["info"] = provider.info(symbol)
+        except Exception as e:
+            print(f"Could not record info for {symbol}: {str(e)}")
+        if not symbol.startswith("^"):
+            for name in STATEMENTS:
+                payloads[name] = _frame_to_json(provider.statement(symbol, name))
+        for name, payload in payloads.items():
+            with open(os.path.join(target, f"{name}.json"), "w", encoding="utf-8") as f:
+                json.dump(payload, f, default=str)
+        print(f"Recorded {symbol} -> {target}")
+
+
+_provider = None
+
+
+def get_provider():
+    """The process-wide market data provider, chosen by MARKET_DATA_PROVIDER"""
+    global _provider
+    if _provider is None:
+        backend = os.getenv("MARKET_DATA_PROVIDER", "yfinance").lower()
+        if backend == "replay":
+            _provider = ReplayProvider()
+        elif backend == "yfinance":
+            _provider = YFinanceProvider()
+        else:
+            raise ValueError(f"Unknown MARKET_DATA_PROVIDER: {backend}")
+    return _provider
+
+
+def set_provider(provider):
+    """Swap the process-wide provider (e.g. a ReplayProvider for benchmarks)"""
+    global _provider
+    _provider = provider
+
+
+if __name__ == "__main__":
+    # Record fixtures for replay: python -m helper.market_data RELIANCE.NS TCS.NS ^NSEI
+    record_fixtures(sys.argv[1:] or ["RELIANCE.NS", "^NSEI"])
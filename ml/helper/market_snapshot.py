@@ -0,0 +1,100 @@
+import threading
+from helper import ohlcv_store, resample
+from helper.market_data import get_provider, slice_period
+from helper.ttl_cache import market_cache
+
+# Static `.info` fields, cached for days under the "profile" class. Every other
+# field (price, market cap, P/E, 52-week range, volume...) is quote-grade and
+# cached under the "quote" class like prices.
+PROFILE_FIELDS = (
+    "longName", "shortName", "sector", "industry", "website", "longBusinessSummary",
+    "fullTimeEmployees", "companyOfficers", "founded", "country", "city", "currency",
+    "exchange", "quoteType",
+)
+
+
+def cached_info(symbol, provider=None):
+    """
+    The `.info` dict for `symbol`, with its static profile fields and its
+    quote-grade fields cached separately under their own expiry classes.
+    One `.info` download refreshes whichever part has expired (and both).
+    """
+    provider = provider or get_provider()
+
+    def fetch():
+        info = provider.info(symbol) or {}
+        profile = {k: v for k, v in info.items() if k in PROFILE_FIELDS}
+        quote = {k: v for k, v in info.items() if k not in PROFILE_FIELDS}
+        market_cache.set(("profile", symbol), profile, "profile")
+        market_cache.set(("info_quote", symbol), quote, "quote")
+        return profile, quote
+
+    quote = market_cache.get_or_fetch(("info_quote", symbol), "quote", lambda: fetch()[1])
+    profile = market_cache.get_or_fetch(("profile", symbol), "profile", lambda: fetch()[0])
+    return {**profile, **quote}
+
+
+# Normalise a ticker to its NSE symbol (RELIANCE, RELIANCE.NS, RELIANCE.BO -> RELIANCE.NS)
+def nse_symbol(ticker):
+    if "." in ticker:
+        ticker = ticker.split(".")[0]
+    return ticker + ".NS"
+
+
+class MarketSnapshot:
+    """
+    All the market data one request needs for a single ticker.
+    Every payload is fetched lazily on first access and then reused, so the
+    report generator and the helpers share one set of round trips. `.info` and
+    the statements also go through the shared market cache across requests
+    (see cached_info for how `.info` is split by expiry class).
+    """
+
+    def __init__(self, ticker):
+        self.ticker = ticker
+        self.provider = get_provider()
+        self._info = None
+        self._history = None
+        self._history_lock = threading.Lock()
+        self._statements = {}
+
+    @property
+    def info(self):
+        """Company profile and quote fields (the `.info` dict)"""
+        if self._info is None:
+            self._info = cached_info(self.ticker, self.provider)
+        return self._info
+
+    def history(self, period="max", interval="1d"):
+        """
+        OHLCV history for the given yfinance period.
+        The full daily history is read once from the local OHLCV store and shorter
+        periods are returned as row slices of it (views, not copies), so treat
+        the result as read-only. Weekly/monthly/quarterly bars (interval 1wk,
+        1mo, 3mo) come from the shared resampling cache.
+        """
+        if interval != "1d":
+            return resample.history(self.ticker, interval, period)
+        with self._history_lock:
+            if self._history is None:
+                self._history = ohlcv_store.load(self.ticker)
+        return slice_period(self._history, period)
+
+    def _statement(self, name):
+        if name not in self._statements:
+            self._statements[name] = market_cache.get_or_fetch(
+                (name, self.ticker), "fundamentals", lambda: self.provider.statement(self.ticker, name)
+            )
+        return self._statements[name]
+
+    @property
+    def balance_sheet(self):
+        return self._statement("balance_sheet")
+
+    @property
+    def income_stmt(self):
+        return self._statement("income_stmt")
+
+    @property
+    def cashflow(self):
+        return self._statement("cashflow")
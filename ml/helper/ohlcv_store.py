@@ -0,0 +1,197 @@
+import json
+import os
+import tempfile
+import time
+from datetime import datetime
+import numpy as np
+import pandas as pd
+from helper.market_data import get_provider, slice_period
+from helper.single_flight import SingleFlight
+from helper.ttl_cache import IST, expires_at
+
+# Local columnar store of daily OHLCV bars, two files per ticker:
+#   <SYMBOL>.bars.npy   - float64 array of shape (6, n): bar dates as days since
+#                         1970-01-01, then one row per OHLCV column
+#   <SYMBOL>.json       - first/last stored date, timezone and last check time
+# Dates and prices live in one file, replaced in a single rename, so a reader
+# can never pair new dates with old prices.
+# The first request for a ticker backfills its full history; after that only
+# the days after the last stored date are downloaded and appended.
+STORE_DIR = os.getenv(
+    "OHLCV_STORE_DIR",
+    os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "ohlcv_store"),
+)
+COLUMNS = ["Open", "High", "Low", "Close", "Volume"]
+
+# Concurrent refreshes of the same ticker share one download
+_refreshes = SingleFlight()
+
+
+def _paths(symbol):
+    base = os.path.join(STORE_DIR, symbol.replace("^", "_"))
+    return base + ".bars.npy", base + ".json"
+
+
+def save_atomic(path, write):
+    """
+    Call write(file) on a uniquely named temp file next to `path`, then rename it
+    over `path`, so readers never see a partial file and concurrent writers
+    (threads or processes) never share a temp file.
+    """
+    fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path) or ".", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            write(f)
+        os.replace(tmp, path)
+    except BaseException:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+        raise
+
+
+def read_meta(symbol):
+    """Stored metadata for `symbol` (first/last date, exchange timezone, last check), or None"""
+    meta_path = _paths(symbol)[1]
+    if not os.path.exists(meta_path):
+        return None
+    with open(meta_path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def _write(symbol, dates, values, meta):
+    bars_path, meta_path = _paths(symbol)
+    os.makedirs(STORE_DIR, exist_ok=True)
+    bars = np.vstack([dates.astype(np.int64).astype(np.float64), values])
+    save_atomic(bars_path, lambda f: np.save(f, bars))
+    save_atomic(meta_path, lambda f: f.write(json.dumps(meta).encode("utf-8")))
+
+
+def _bar_dates(frame):
+    index = frame.index.tz_localize(None) if frame.index.tz is not None else frame.index
+    return index.normalize().values.astype("datetime64[D]")
+
+
+def _to_arrays(frame):
+    """Split a yfinance history frame into (dates, values) store arrays"""
+    values = frame[COLUMNS].to_numpy(dtype=np.float64).T.copy()
+    return _bar_dates(frame), values
+
+
+def _has_corporate_action(frame):
+    """Dividends and splits re-adjust every earlier bar, so the stored history is stale"""
+    for column in ("Dividends", "Stock Splits"):
+        if column in frame.columns and (frame[column] != 0).any():
+            return True
+    return False
+
+
+def _is_fresh(meta):
+    # The latest bar is a quote: re-check it on the quote schedule (held overnight)
+    return meta is not None and time.time() < expires_at("quote", datetime.fromtimestamp(meta["checked_at"], IST)).timestamp()
+
+
+def update(symbol):
+    """Bring the stored history for `symbol` up to date. Returns its metadata, or None if Yahoo has no data."""
+    meta = read_meta(symbol)
+    if _is_fresh(meta):
+        return meta
+    return _refreshes.do(symbol, lambda: _refresh(symbol))
+
+
+def _refresh(symbol):
+    meta = read_meta(symbol)
+    if _is_fresh(meta):
+        # Another request refreshed it while we were waiting
+        return meta
+
+    provider = get_provider()
+    if meta is None:
+        fetched = provider.history(symbol, period="max")
+        stored = None
+    else:
+        # Re-fetch the last stored day as well, it may have been a partial intraday bar
+        fetched = provider.history(symbol, start=meta["last"])
+        stored = load_arrays(symbol)
+        if _has_corporate_action(fetched[_bar_dates(fetched) > np.datetime64(meta["last"])]):
+            fetched = provider.history(symbol, period="max")
+            stored = None
+
+    if fetched.empty:
+        if meta is not None:
+            meta["checked_at"] = time.time()
+            save_atomic(_paths(symbol)[1], lambda f: f.write(json.dumps(meta).encode("utf-8")))
+        return meta
+
+    dates, values = _to_arrays(fetched)
+    if stored is not None:
+        old_dates, old_values = stored
+        keep = old_dates < dates[0]
+        dates = np.concatenate([old_dates[keep], dates])
+        values = np.concatenate([old_values[:, keep], values], axis=1)
+
+    meta = {
+        "first": str(dates[0]),
+        "last": str(dates[-1]),
+        "tz": str(fetched.index.tz) if fetched.index.tz is not None else (meta or {}).get("tz"),
+        "checked_at": time.time(),
+    }
+    _write(symbol, dates, values, meta)
+    return meta
+
+
+def stored_symbols():
+    """Tickers that have history in the local store"""
+    if not os.path.isdir(STORE_DIR):
+        return []
+    suffix = ".bars.npy"
+    return sorted(
+        "^" + name[1:-len(suffix)] if name.startswith("_") else name[:-len(suffix)]
+        for name in os.listdir(STORE_DIR)
+        if name.endswith(suffix)
+    )
+
+
+def _map(path):
+    """
+    Read-only memory map of a .npy file. Header and data are read through one
+    open file, so a concurrent rename over `path` cannot pair them up wrongly.
+    """
+    with open(path, "rb") as f:
+        version = np.lib.format.read_magic(f)
+        read_header = np.lib.format.read_array_header_1_0 if version == (1, 0) else np.lib.format.read_array_header_2_0
+        shape, fortran_order, dtype = read_header(f)
+        return np.memmap(f, dtype=dtype, mode="r", shape=shape, offset=f.tell(),
+                         order="F" if fortran_order else "C")
+
+
+def load_arrays(symbol):
+    """
+    Stored (dates, values) arrays for `symbol` without refreshing them: values is
+    a read-only memory map of shape (5, n), dates a datetime64[D] array.
+    """
+    bars = _map(_paths(symbol)[0])
+    return bars[0].astype(np.int64).astype("datetime64[D]"), bars[1:]
+
+
+def load(symbol):
+    """Full stored daily history for `symbol` as a yfinance-style DataFrame, refreshed if stale"""
+    try:
+        meta = update(symbol)
+    except Exception as e:
+        # Serve whatever is on disk if Yahoo is unreachable
+        print(f"Could not refresh stored history for {symbol}: {str(e)}")
+        meta = read_meta(symbol)
+
+    if meta is None:
+        return pd.DataFrame(columns=COLUMNS, index=pd.DatetimeIndex([], name="Date"))
+
+    dates, values = load_arrays(symbol)
+    index = pd.DatetimeIndex(dates.astype("datetime64[ns]"), name="Date")
+    if meta.get("tz"):
+        index = index.tz_localize(meta["tz"])
+    return pd.DataFrame(np.array(values.T), index=index, columns=COLUMNS)
+
+
+def history(symbol, period="max"):
+    """Stored daily history for `symbol` over a yfinance-style period"""
+    return slice_period(load(symbol), period)
@@ -0,0 +1,174 @@
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from helper.single_flight import SingleFlight
+
+# Store of generated reports keyed by ticker, data as-of date and report
+# version (see stock_report_generator.report_key). A report is built once per
+# key and then served from the store: later downloads of the same report, and
+# conditional requests carrying its ETag, never construct a StockReport.
+#
+# The memory tier is an LRU bounded by REPORT_CACHE_MB of PDF bytes. Setting
+# REPORT_ARTIFACT_DIR adds a persistent tier: each report is kept there as
+# <key>.pdf with a <key>.json sidecar, written atomically (temp file then
+# rename), so concurrent requests never share a partially written file.
+ARTIFACT_DIR = os.getenv("REPORT_ARTIFACT_DIR")
+MAX_BYTES = int(float(os.getenv("REPORT_CACHE_MB", "64")) * 1024 * 1024)
+
+
+def report_etag(key):
+    """
+    Weak ETag for the report stored under `key`. It depends only on the key, so
+    a conditional request can be answered without the stored PDF; a rebuild
+    for the same key is an equivalent report (same data, same version).
+    """
+    return hashlib.sha256(key.encode("utf-8")).hexdigest()[:32]
+
+
+class ReportArtifact:
+    def __init__(self, key, filename, pdf, last_modified):
+        self.key = key
+        self.filename = filename
+        self.pdf = pdf
+        self.etag = report_etag(key)
+        self.last_modified = last_modified
+
+
+def _write_atomic(directory, path, data):
+    fd, tmp = tempfile.mkstemp(dir=directory, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        os.replace(tmp, path)
+    except BaseException:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+        raise
+
+
+class ReportStore:
+    """
+    Two-tier store of generated reports: an in-memory LRU bounded by total
+    bytes and an optional directory. Concurrent misses for a key build once.
+    """
+
+    def __init__(self, directory=ARTIFACT_DIR, max_bytes=MAX_BYTES):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+        self._flights = SingleFlight()
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def _paths(self, key):
+        return os.path.join(self.directory, f"{key}.pdf"), os.path.join(self.directory, f"{key}.json")
+
+    def _remember(self, artifact):
+        if len(artifact.pdf) > self.max_bytes:
+            return
+        with self._lock:
+            previous = self._entries.pop(artifact.key, None)
+            if previous is not None:
+                self._size -= len(previous.pdf)
+            self._entries[artifact.key] = artifact
+            self._size += len(artifact.pdf)
+            while self._size > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self._size -= len(evicted.pdf)
+                self.evictions += 1
+
+    def _read_disk(self, key):
+        if not self.directory:
+            return None
+        pdf_path, meta_path = self._paths(key)
+        try:
+            with open(meta_path, "r", encoding="utf-8") as f:
+                meta = json.load(f)
+            with open(pdf_path, "rb") as f:
+                pdf = f.read()
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError) as e:
+            print(f"Ignoring unreadable report artifact {key}: {str(e)}")
+            return None
+        return ReportArtifact(key, meta["filename"], pdf, meta["last_modified"])
+
+    def _write_disk(self, artifact):
+        if not self.directory:
+            return
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            pdf_path, meta_path = self._paths(artifact.key)
+            # PDF first: the sidecar only appears once the PDF is complete
+            _write_atomic(self.directory, pdf_path, artifact.pdf)
+            meta = {"filename": artifact.filename, "last_modified": artifact.last_modified, "etag": artifact.etag}
+            _write_atomic(self.directory, meta_path, json.dumps(meta).encode("utf-8"))
+        except OSError as e:
+            print(f"Could not store report artifact: {str(e)}")
+
+    def get(self, key):
+        """Stored report for `key`, or None"""
+        with self._lock:
+            artifact = self._entries.get(key)
+            if artifact is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return artifact
+        artifact = self._read_disk(key)
+        if artifact is not None:
+            with self._lock:
+                self.disk_hits += 1
+            self._remember(artifact)
+        return artifact
+
+    def get_or_build(self, key, build):
+        """
+        Stored report for `key`, calling build() -> (filename, PDF bytes) and
+        storing the result on a miss.
+        """
+        artifact = self.get(key)
+        if artifact is not None:
+            return artifact
+
+        def build_and_store():
+            filename, pdf = build()
+            artifact = ReportArtifact(key, filename, pdf, time.time())
+            with self._lock:
+                self.misses += 1
+            self._remember(artifact)
+            self._write_disk(artifact)
+            return artifact
+
+        return self._flights.do(key, build_and_store)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._size = 0
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.disk_hits + self.misses
+            return {
+                "size": len(self._entries),
+                "bytes": self._size,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "hit_rate": (self.hits + self.disk_hits) / lookups if lookups else 0.0,
+                "evictions": self.evictions,
+                "disk_tier": bool(self.directory),
+            }
+
+
+# Shared store of generated reports
+report_store = ReportStore()
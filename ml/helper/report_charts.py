@@ -0,0 +1,548 @@
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from io import BytesIO
+import matplotlib
+matplotlib.use("Agg")
+import matplotlib as mpl
+import matplotlib.dates as mdates
+import numpy as np
+import seaborn as sns
+from PIL import Image
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.collections import LineCollection, PolyCollection
+from matplotlib.figure import Figure
+from helper.chart_cache import chart_cache, chart_key
+
+# Chart rendering for the stock report. Each chart is a module-level function
+# taking a payload of plain NumPy arrays and scalars and returning image
+# bytes in the format chosen by render()/render_charts().
+# Charts draw on explicit Figure/Agg canvas objects (never pyplot's global
+# state), so they are safe to render on several threads at once, and they can
+# be rendered in worker processes: render_charts() sends a report's charts to
+# a shared process pool, where they render concurrently across cores, and
+# falls back to rendering in this process if the pool is unavailable.
+# Rendered images are cached by a fingerprint of their payload (see
+# helper/chart_cache.py), so unchanged charts are never drawn twice.
+
+# Set default theme for all visualizations (global rcParams, set once at import)
+mpl.style.use('seaborn-v0_8-pastel')
+sns.set_theme(style="ticks", palette="pastel")
+
+# Configure fonts and colors
+TITLE_FONT_SIZE = 16
+SUBTITLE_FONT_SIZE = 12
+TEXT_FONT_SIZE = 10
+PRIMARY_COLOR = "#2E86C1"  # Blue
+SECONDARY_COLOR = "#F39C12"  # Orange
+ACCENT_COLOR = "#E74C3C"  # Red
+POSITIVE_COLOR = "#2ECC71"  # Green
+NEGATIVE_COLOR = "#E74C3C"  # Red
+NEUTRAL_COLOR = "#7F8C8D"  # Gray
+
+# CHART_WORKERS=0 renders in the calling process
+MAX_WORKERS = int(os.getenv("CHART_WORKERS", str(min(7, os.cpu_count() or 1))))
+RENDER_TIMEOUT = float(os.getenv("CHART_TIMEOUT", "60"))
+# Part of every chart cache key: bump when a renderer's output changes
+CHART_VERSION = 1
+
+# Output formats: 'png' (full colour), 'png8' (palette-quantized PNG), 'jpeg'
+# and 'svg' (vector). DPI applies to the raster formats.
+IMAGE_FORMATS = ('png', 'png8', 'jpeg', 'svg')
+DEFAULT_DPI = 150
+JPEG_QUALITY = int(os.getenv("CHART_JPEG_QUALITY", "80"))
+
+# Figure templates: size, panel layout and fixed margins sized for the report's
+# titles and 45-degree date labels (cheaper than running tight_layout per chart)
+TEMPLATES = {
+    'single': {
+        'figsize': (10, 6),
+        'rows': 1,
+        'margins': dict(left=0.09, right=0.97, top=0.87, bottom=0.17),
+    },
+    'three_panel': {
+        'figsize': (10, 12),
+        'rows': 3,
+        'height_ratios': [2, 1, 1],
+        'margins': dict(left=0.09, right=0.97, top=0.96, bottom=0.1, hspace=0.35),
+    },
+}
+
+# One figure (and canvas) per template per thread, cleared and reused for every chart
+_figures = threading.local()
+# Image format and DPI the renderers on this thread encode with (see _draw)
+_output = threading.local()
+
+
+def _figure(template='single'):
+    """Reset and return this thread's figure for `template` with fresh axes"""
+    figures = _figures.__dict__.setdefault('figures', {})
+    spec = TEMPLATES[template]
+    fig = figures.get(template)
+    if fig is None:
+        fig = Figure(figsize=spec['figsize'])
+        FigureCanvasAgg(fig)
+        figures[template] = fig
+    else:
+        fig.clear()
+
+    gridspec_kw = {'height_ratios': spec['height_ratios']} if 'height_ratios' in spec else None
+    axes = fig.subplots(spec['rows'], 1, squeeze=False, gridspec_kw=gridspec_kw)[:, 0]
+    fig.subplots_adjust(**spec['margins'])
+    return fig, list(axes)
+
+
+def _encode(fig, image_format, dpi):
+    img_data = BytesIO()
+    if image_format == 'png8':
+        # Charts are mostly flat colours: a 256-colour palette is visually
+        # lossless and several times smaller than 24/32-bit PNG
+        fig.set_dpi(dpi)
+        fig.canvas.draw()
+        pixels = np.asarray(fig.canvas.buffer_rgba())[..., :3]
+        palette = Image.fromarray(pixels).quantize(colors=256, method=Image.Quantize.FASTOCTREE)
+        palette.save(img_data, format='png', optimize=True)
+    elif image_format == 'jpeg':
+        fig.savefig(img_data, format='jpeg', dpi=dpi, pil_kwargs={'quality': JPEG_QUALITY, 'optimize': True})
+    else:
+        fig.savefig(img_data, format=image_format, dpi=dpi)
+    return img_data.getvalue()
+
+
+def _save(fig):
+    """Encode the figure in this thread's output format and drop its artists until the next chart"""
+    image = _encode(fig, getattr(_output, 'format', 'png'), getattr(_output, 'dpi', DEFAULT_DPI))
+    fig.clear()
+    return image
+
+
+def plot_width_px(template='single', dpi=DEFAULT_DPI, width_in=None):
+    """
+    Width in pixels of a chart's plot area at `dpi`: the most points a line can
+    usefully show. width_in is the width in inches the image is shown at (the
+    report scales charts down to fit the page); it defaults to the figure's own
+    width. Vector output (dpi None) is sized as at DEFAULT_DPI.
+    """
+    spec = TEMPLATES[template]
+    margins = spec['margins']
+    width_in = spec['figsize'][0] if width_in is None else width_in
+    return int(width_in * (margins['right'] - margins['left']) * (dpi or DEFAULT_DPI))
+
+
+def _bar_outlines(x, bottom, top, width):
+    """(n, 4, 2) rectangle vertices for bars centred on x, for one PolyCollection"""
+    x, bottom, top = np.broadcast_arrays(np.asarray(x, dtype=float), bottom, top)
+    left, right = x - width / 2, x + width / 2
+    return np.stack([
+        np.column_stack([left, bottom]),
+        np.column_stack([left, top]),
+        np.column_stack([right, top]),
+        np.column_stack([right, bottom]),
+    ], axis=1)
+
+
+def _date_axis(ax, locator, date_format):
+    ax.xaxis.set_major_locator(locator)
+    ax.xaxis.set_major_formatter(mdates.DateFormatter(date_format))
+    ax.tick_params(axis='x', labelrotation=45)
+
+
+def price_trend(p):
+    """Price trend over the past year with 50/200-day moving averages"""
+    fig, (ax,) = _figure()
+    ax.plot(p['dates'], p['close'], color=PRIMARY_COLOR, linewidth=2)
+
+    # Add 50-day moving average
+    ax.plot(p['dates'], p['ma50'], color=SECONDARY_COLOR, linewidth=1.5, linestyle='--', label='50-day MA')
+
+    # Add 200-day moving average if enough data
+    if p['ma200'] is not None:
+        ax.plot(p['dates'], p['ma200'], color=ACCENT_COLOR, linewidth=1.5, linestyle='-.', label='200-day MA')
+
+    # Format axes
+    ax.set_title(f"{p['company_name']} - 1 Year Price Trend", fontsize=TITLE_FONT_SIZE, fontweight='bold')
+    ax.set_xlabel('Date', fontsize=TEXT_FONT_SIZE)
+    ax.set_ylabel('Price (₹)', fontsize=TEXT_FONT_SIZE)
+    ax.grid(True, alpha=0.3)
+    ax.legend()
+
+    # Format date ticks
+    _date_axis(ax, mdates.MonthLocator(interval=1), '%b %Y')
+
+    return _save(fig)
+
+
+def volume_analysis(p):
+    """Daily volume over the past year, coloured by up/down day, with its 20-day average"""
+    fig, (ax,) = _figure()
+
+    # Create a colormap based on price changes
+    colors = np.where(p['up'], POSITIVE_COLOR, NEGATIVE_COLOR)
+
+    # Add 20-day moving average of volume
+    ax.plot(p['dates'], p['vol_ma20'], color=PRIMARY_COLOR, linewidth=2, linestyle='-', label='20-day Volume MA')
+
+    # Plot volume bars (one rectangle collection)
+    bars = _bar_outlines(mdates.date2num(p['dates']), 0, p['volume'], 0.8)
+    ax.add_collection(PolyCollection(bars, facecolors=colors, edgecolors='none', alpha=0.7))
+    ax.autoscale_view()
+    ax.set_ylim(bottom=0)
+
+    # Format axes
+    ax.set_title(f"{p['company_name']} - Trading Volume Analysis", fontsize=TITLE_FONT_SIZE, fontweight='bold')
+    ax.set_xlabel('Date', fontsize=TEXT_FONT_SIZE)
+    ax.set_ylabel('Volume', fontsize=TEXT_FONT_SIZE)
+    ax.grid(True, alpha=0.3)
+    ax.legend()
+
+    # Format date ticks
+    _date_axis(ax, mdates.MonthLocator(interval=1), '%b %Y')
+
+    # Format y-axis with millions/billions
+    ax.yaxis.set_major_formatter(mpl.ticker.FuncFormatter(lambda x, p: f'{x/1000000:.1f}M' if x < 1e9 else f'{x/1000000000:.1f}B'))
+
+    return _save(fig)
+
+
+def financial_metrics(p):
+    """Key financial metrics (₹ Crores) as a bar chart"""
+    fig, (ax,) = _figure()
+    metrics_to_plot = p['metrics']
+
+    if not metrics_to_plot:
+        # If no metrics available, create a placeholder
+        ax.text(0.5, 0.5, "Financial metrics data not available",
+                ha='center', va='center', fontsize=12, transform=ax.transAxes)
+    else:
+        # Plot bar chart
+        x = list(metrics_to_plot.keys())
+        y = list(metrics_to_plot.values())
+
+        bars = ax.bar(x, y, color=[PRIMARY_COLOR, ACCENT_COLOR, SECONDARY_COLOR, POSITIVE_COLOR])
+
+        # Add labels
+        ax.set_title(f"{p['company_name']} - Key Financial Metrics (₹ Crores)", fontsize=TITLE_FONT_SIZE, fontweight='bold')
+        ax.set_ylabel('₹ Crores', fontsize=TEXT_FONT_SIZE)
+
+        # Add data labels on top of bars
+        for bar in bars:
+            height = bar.get_height()
+            ax.text(bar.get_x() + bar.get_width()/2., height + 0.1,
+                    f'₹{height:.1f} Cr', ha='center', va='bottom', rotation=0, fontsize=9)
+
+        ax.grid(True, alpha=0.3, axis='y')
+
+    return _save(fig)
+
+
+def candlestick(p):
+    """
+    Candlestick chart of daily (or weekly) bars. Wicks and bodies are each one batched
+    collection, so a year of candles costs about the same as a month.
+    """
+    fig, (ax,) = _figure()
+
+    dates = p['dates'].astype('datetime64[D]').tolist()
+    x = np.arange(len(dates), dtype=float)
+    open_, high, low, close = p['open'], p['high'], p['low'], p['close']
+    up = close >= open_
+
+    # Candlestick wicks (high-low range)
+    wicks = np.stack([np.column_stack([x, low]), np.column_stack([x, high])], axis=1)
+    ax.add_collection(LineCollection(wicks, colors='black', linewidths=1))
+
+    # Candlestick bodies (open-close range), green for up days and red for down days
+    bodies = _bar_outlines(x, np.minimum(open_, close), np.maximum(open_, close), 0.8)
+    ax.add_collection(PolyCollection(bodies, facecolors=np.where(up, POSITIVE_COLOR, NEGATIVE_COLOR),
+                                     edgecolors='none', alpha=0.7))
+
+    # Label at most ~30 dates so long ranges stay readable
+    step = max(1, int(np.ceil(len(dates) / 30)))
+    ax.set_xticks(x[::step])
+    ax.set_xticklabels([date.strftime('%d-%b') for date in dates[::step]], rotation=45)
+    ax.set_xlim(-1, len(dates))
+    if len(dates):
+        pad = (np.nanmax(high) - np.nanmin(low)) * 0.05 or 1
+        ax.set_ylim(np.nanmin(low) - pad, np.nanmax(high) + pad)
+
+    # Set chart title and labels
+    ax.set_title(f"{p['company_name']} - {p.get('range_label', '30-Day')} Price Action", fontsize=TITLE_FONT_SIZE, fontweight='bold')
+    ax.set_xlabel('Date', fontsize=TEXT_FONT_SIZE)
+    ax.set_ylabel('Price (₹)', fontsize=TEXT_FONT_SIZE)
+    ax.grid(True, alpha=0.3, axis='y')
+
+    return _save(fig)
+
+
+def performance_comparison(p):
+    """Stock vs NIFTY 50 over the past year, both normalised to 100"""
+    fig, (ax,) = _figure()
+
+    if p.get('error'):
+        ax.text(0.5, 0.5, f"Could not load comparison data: {p['error']}",
+               ha='center', va='center', fontsize=12, transform=ax.transAxes)
+    else:
+        # Plot both series
+        ax.plot(p['dates'], p['stock_norm'], color=PRIMARY_COLOR, linewidth=2, label=f"{p['company_name']}")
+        ax.plot(p['benchmark_dates'], p['benchmark_norm'], color=SECONDARY_COLOR, linewidth=2, linestyle='--', label="NIFTY 50")
+
+        # Calculate outperformance
+        outperformance = p['stock_norm'][-1] - p['benchmark_norm'][-1]
+
+        # Format axes
+        performance_text = f"Outperformed by {outperformance:.2f}%" if outperformance > 0 else f"Underperformed by {-outperformance:.2f}%"
+        ax.set_title(f"{p['company_name']} vs NIFTY 50 - Relative Performance\n{performance_text}",
+                fontsize=TITLE_FONT_SIZE, fontweight='bold')
+
+    ax.set_xlabel('Date', fontsize=TEXT_FONT_SIZE)
+    ax.set_ylabel('Normalized Price (Starting at 100)', fontsize=TEXT_FONT_SIZE)
+    ax.grid(True, alpha=0.3)
+    ax.legend()
+
+    # Format date ticks
+    _date_axis(ax, mdates.MonthLocator(interval=1), '%b %Y')
+
+    return _save(fig)
+
+
+def historical_performance(p):
+    """Long-term price history (downsampled daily closes) with large monthly moves, ATH and CAGR"""
+    fig, (ax,) = _figure()
+
+    # Check if we have enough data
+    if not p['enough_history']:
+        ax.text(0.5, 0.5, "Insufficient historical data available (less than 1 year)",
+               ha='center', va='center', fontsize=12, transform=ax.transAxes)
+    else:
+        # Plot closes
+        ax.plot(p['dates'], p['close'], color=PRIMARY_COLOR, linewidth=1.5)
+
+        # Add 200-day moving average
+        ax.plot(p['dates'], p['ma200'], color=SECONDARY_COLOR, linewidth=1.5, linestyle='--', label='200-day MA')
+
+        # Highlight significant price changes (>10% in a month) on the last trading day of the month
+        for date, close, up in zip(p['move_dates'], p['move_closes'], p['move_up']):
+            ax.plot(date, close, 'o',
+                     color=POSITIVE_COLOR if up else NEGATIVE_COLOR,
+                     markersize=6)
+
+        # Add annotations for current price and all-time high
+        all_time_high, current_price = p['ath'], p['current_price']
+        pct_from_ath = ((current_price - all_time_high) / all_time_high) * 100
+
+        ax.annotate(f'ATH: ₹{all_time_high:.2f}',
+                     xy=(p['ath_date'], all_time_high),
+                     xytext=(10, 20),
+                     textcoords='offset points',
+                     arrowprops=dict(arrowstyle='->', color='black', lw=1),
+                     fontsize=9)
+
+        if p['current_date'] != p['ath_date']:  # Don't annotate if current price is ATH
+            ax.annotate(f'Current: ₹{current_price:.2f}\n({pct_from_ath:.1f}% from ATH)',
+                         xy=(p['current_date'], current_price),
+                         xytext=(10, -30),
+                         textcoords='offset points',
+                         arrowprops=dict(arrowstyle='->', color='black', lw=1),
+                         fontsize=9)
+
+        if p['cagr'] is not None:
+            ax.set_title(f"{p['company_name']} - {p['years']:.1f}-Year Price History\nCAGR: {p['cagr']:.2f}%",
+                      fontsize=TITLE_FONT_SIZE, fontweight='bold')
+        else:
+            ax.set_title(f"{p['company_name']} - Long-term Price History",
+                      fontsize=TITLE_FONT_SIZE, fontweight='bold')
+
+    ax.set_xlabel('Date', fontsize=TEXT_FONT_SIZE)
+    ax.set_ylabel('Price (₹)', fontsize=TEXT_FONT_SIZE)
+    ax.grid(True, alpha=0.3)
+    ax.legend()
+
+    # Format date ticks (about ten year labels at most, for 'max' histories)
+    years = (p['dates'][-1] - p['dates'][0]) / np.timedelta64(365, 'D') if p['enough_history'] else 0
+    _date_axis(ax, mdates.YearLocator(max(1, int(np.ceil(years / 10)))), '%Y')
+
+    return _save(fig)
+
+
+def technical_indicators(p):
+    """Bollinger bands, MACD and RSI panels over the last 6 months"""
+    # Create a figure with 3 subplots
+    fig, (ax1, ax2, ax3) = _figure('three_panel')
+    dates = p['dates']
+
+    # Plot 1: Price and Bollinger Bands
+    ax1.plot(dates, p['close'], color=PRIMARY_COLOR, label='Close Price')
+    ax1.plot(dates, p['bb_mid'], color=NEUTRAL_COLOR, label='20-day SMA')
+    ax1.plot(dates, p['bb_upper'], color=SECONDARY_COLOR, linestyle='--', label='Upper Band')
+    ax1.plot(dates, p['bb_lower'], color=SECONDARY_COLOR, linestyle='--', label='Lower Band')
+    ax1.fill_between(dates, p['bb_upper'], p['bb_lower'], color=SECONDARY_COLOR, alpha=0.1)
+
+    ax1.set_title(f"{p['company_name']} - Technical Analysis", fontsize=TITLE_FONT_SIZE, fontweight='bold')
+    ax1.set_ylabel('Price (₹)', fontsize=TEXT_FONT_SIZE)
+    ax1.grid(True, alpha=0.3)
+    ax1.legend(loc='upper left')
+
+    # Plot 2: MACD
+    histogram = p['macd_hist']
+    ax2.plot(dates, p['macd'], color=PRIMARY_COLOR, label='MACD')
+    ax2.plot(dates, p['macd_signal'], color=SECONDARY_COLOR, label='Signal')
+
+    # Mark where the histogram changes sign, as one batch of full-height lines
+    valid = ~np.isnan(histogram[1:]) & ~np.isnan(histogram[:-1])
+    crossings = np.flatnonzero(valid & ((histogram[1:] >= 0) != (histogram[:-1] >= 0))) + 1
+    ax2.vlines(dates[crossings], 0, 1, transform=ax2.get_xaxis_transform(),
+               colors=NEUTRAL_COLOR, linestyles='--', alpha=0.3)
+
+    # Positive and negative histogram values as two rectangle collections
+    x = mdates.date2num(dates)
+    for mask, color, label in ((histogram >= 0, POSITIVE_COLOR, 'Positive MACD'),
+                               (histogram < 0, NEGATIVE_COLOR, 'Negative MACD')):
+        bars = _bar_outlines(x[mask], 0, histogram[mask], 1.5)
+        ax2.add_collection(PolyCollection(bars, facecolors=color, edgecolors='none', alpha=0.7, label=label))
+    ax2.autoscale_view()
+
+    ax2.set_ylabel('MACD', fontsize=TEXT_FONT_SIZE)
+    ax2.grid(True, alpha=0.3)
+    ax2.axhline(y=0, color='black', linestyle='-', alpha=0.3)
+    ax2.legend(loc='upper left')
+
+    # Plot 3: RSI
+    ax3.plot(dates, p['rsi'], color=ACCENT_COLOR, label='RSI')
+
+    # Add overbought/oversold levels
+    ax3.axhline(y=70, color=NEGATIVE_COLOR, linestyle='--', alpha=0.5, label='Overbought (70)')
+    ax3.axhline(y=30, color=POSITIVE_COLOR, linestyle='--', alpha=0.5, label='Oversold (30)')
+    ax3.axhline(y=50, color=NEUTRAL_COLOR, linestyle='-', alpha=0.3)
+
+    # Fill overbought/oversold regions
+    ax3.fill_between(dates, 70, 100, color=NEGATIVE_COLOR, alpha=0.1)
+    ax3.fill_between(dates, 0, 30, color=POSITIVE_COLOR, alpha=0.1)
+
+    ax3.set_ylabel('RSI', fontsize=TEXT_FONT_SIZE)
+    ax3.set_ylim(0, 100)
+    ax3.grid(True, alpha=0.3)
+    ax3.legend(loc='upper left')
+
+    # Set common x-axis label and format
+    fig.text(0.5, 0.015, 'Date', ha='center', fontsize=TEXT_FONT_SIZE)
+
+    # Format date ticks
+    for ax in [ax1, ax2, ax3]:
+        _date_axis(ax, mdates.MonthLocator(), '%b %Y')
+
+    return _save(fig)
+
+
+RENDERERS = {
+    'price_trend': price_trend,
+    'volume_analysis': volume_analysis,
+    'financial_metrics': financial_metrics,
+    'candlestick': candlestick,
+    'performance_comparison': performance_comparison,
+    'historical_performance': historical_performance,
+    'technical_indicators': technical_indicators,
+}
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def _draw(kind, payload, image_format, dpi):
+    """Run the renderer for `kind`, encoding its figure as `image_format` at `dpi`"""
+    _output.format, _output.dpi = image_format, dpi
+    return RENDERERS[kind](payload)
+
+
+def _cache_key(kind, payload, image_format, dpi):
+    if image_format not in IMAGE_FORMATS:
+        raise ValueError(f"Unsupported chart image format: {image_format}. Use one of {', '.join(IMAGE_FORMATS)}")
+    return chart_key(
+        kind, payload,
+        version=CHART_VERSION,
+        matplotlib=matplotlib.__version__,
+        format=image_format,
+        dpi=None if image_format == 'svg' else dpi,
+        quality=JPEG_QUALITY if image_format == 'jpeg' else None,
+    )
+
+
+def render(kind, payload, image_format='png', dpi=DEFAULT_DPI):
+    """Render one chart in this process (or take it from the chart cache) and return its image bytes"""
+    key = _cache_key(kind, payload, image_format, dpi)
+    image = chart_cache.get(key)
+    if image is None:
+        image = _draw(kind, payload, image_format, dpi)
+        chart_cache.put(key, image)
+    return image
+
+
+def _get_pool():
+    global _pool
+    with _pool_lock:
+        if _pool is None and MAX_WORKERS > 0:
+            # Fork a clean, single-threaded server with this module preloaded rather
+            # than forking the (multi-threaded) web process itself
+            if "forkserver" in multiprocessing.get_all_start_methods():
+                context = multiprocessing.get_context("forkserver")
+                context.set_forkserver_preload([__name__])
+            else:
+                context = multiprocessing.get_context("spawn")
+            _pool = ProcessPoolExecutor(max_workers=MAX_WORKERS, mp_context=context)
+        return _pool
+
+
+def _reset_pool(pool):
+    global _pool
+    with _pool_lock:
+        if _pool is pool:
+            _pool = None
+    pool.shutdown(wait=False, cancel_futures=True)
+
+
+def render_charts(charts, image_format='png', dpi=DEFAULT_DPI):
+    """
+    Render several charts concurrently in the worker pool.
+
+    charts: {name: (kind, payload)} where kind is a key of RENDERERS
+    image_format: one of IMAGE_FORMATS; dpi applies to raster formats
+    Returns {name: image bytes}. Charts already in the chart cache are not
+    rendered again; charts the pool fails to render are drawn in this
+    process instead.
+    """
+    images, keys = {}, {}
+    for name, (kind, payload) in charts.items():
+        keys[name] = _cache_key(kind, payload, image_format, dpi)
+        image = chart_cache.get(keys[name])
+        if image is not None:
+            images[name] = image
+    pending = {name: chart for name, chart in charts.items() if name not in images}
+    if not pending:
+        return images
+
+    pool = _get_pool()
+    futures = {}
+    if pool is not None:
+        try:
+            futures = {name: pool.submit(_draw, kind, payload, image_format, dpi) for name, (kind, payload) in pending.items()}
+        except (BrokenProcessPool, RuntimeError, OSError) as e:
+            print(f"Chart pool unavailable, rendering in process: {str(e)}")
+            _reset_pool(pool)
+            futures = {}
+
+    for name, (kind, payload) in pending.items():
+        image = None
+        if name in futures:
+            try:
+                image = futures[name].result(timeout=RENDER_TIMEOUT)
+            except BrokenProcessPool as e:
+                print(f"Chart pool broke while rendering {name}: {str(e)}")
+                _reset_pool(pool)
+            except Exception as e:
+                print(f"Rendering {name} in a worker failed: {str(e)}")
+        if image is None:
+            image = _draw(kind, payload, image_format, dpi)
+        chart_cache.put(keys[name], image)
+        images[name] = image
+    return {name: images[name] for name in charts}
@@ -0,0 +1,133 @@
+import os
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from helper.ttl_cache import IST
+
+# Background report generation. A request enqueues a job and gets its id back
+# at once; a bounded pool of REPORT_JOB_WORKERS threads builds the reports, so
+# throughput is capped by workers rather than by open HTTP connections. Jobs
+# with the same key (by default the ticker and IST date; the app uses the
+# report's store key, which also changes with each intraday slot) are merged
+# into one. Finished jobs are remembered for REPORT_JOB_RETENTION seconds; they
+# hold only the report's store key, the PDF itself stays in report_store.
+MAX_WORKERS = int(os.getenv("REPORT_JOB_WORKERS", "2"))
+MAX_PENDING = int(os.getenv("REPORT_JOB_MAX_PENDING", "32"))
+RETENTION = float(os.getenv("REPORT_JOB_RETENTION", "3600"))
+
+QUEUED, RUNNING, DONE, FAILED = "queued", "running", "done", "failed"
+
+
+class QueueFull(Exception):
+    """Raised when too many report jobs are already waiting"""
+
+
+class ReportJob:
+    def __init__(self, ticker, key):
+        self.id = uuid.uuid4().hex
+        self.ticker = ticker
+        self.key = key
+        self.status = QUEUED
+        self.created = time.time()
+        self.started = None
+        self.finished = None
+        self.filename = None
+        self.report_key = None
+        self.size = None
+        self.error = None
+
+    def to_dict(self):
+        return {
+            "job_id": self.id,
+            "ticker": self.ticker,
+            "status": self.status,
+            "created": datetime.fromtimestamp(self.created, IST).isoformat(),
+            "started": datetime.fromtimestamp(self.started, IST).isoformat() if self.started else None,
+            "finished": datetime.fromtimestamp(self.finished, IST).isoformat() if self.finished else None,
+            "filename": self.filename,
+            "size": self.size,
+            "error": self.error,
+        }
+
+
+def daily_key(ticker):
+    """Default job key: one report per ticker per IST day"""
+    return ticker.strip().upper().removesuffix(".NS"), datetime.now(IST).date()
+
+
+class ReportJobQueue:
+    """
+    Runs build(ticker) -> ReportArtifact on a bounded worker pool and keeps
+    the artifact's filename, store key and size on the job.
+    Jobs are looked up by id; submitting a ticker whose key(ticker) matches a
+    job that is queued, running or done returns that job instead of starting
+    another.
+    """
+
+    def __init__(self, build, key=daily_key, workers=MAX_WORKERS, max_pending=MAX_PENDING, retention=RETENTION):
+        self.build = build
+        self.key = key
+        self.max_pending = max_pending
+        self.retention = retention
+        self._pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="report-job")
+        self._jobs = OrderedDict()
+        self._by_key = {}
+        self._lock = threading.Lock()
+
+    def _prune(self, now):
+        """Forget finished jobs older than the retention period (caller holds the lock)"""
+        for job_id, job in list(self._jobs.items()):
+            if job.finished is not None and now - job.finished > self.retention:
+                del self._jobs[job_id]
+                if self._by_key.get(job.key) is job:
+                    del self._by_key[job.key]
+
+    def submit(self, ticker):
+        """Enqueue a report for `ticker` (or join the job for the same key) and return the job"""
+        key = self.key(ticker)
+        now = time.time()
+        with self._lock:
+            self._prune(now)
+            job = self._by_key.get(key)
+            if job is not None and job.status != FAILED:
+                return job
+
+            pending = sum(1 for j in self._jobs.values() if j.status in (QUEUED, RUNNING))
+            if pending >= self.max_pending:
+                raise QueueFull(f"{pending} reports are already being generated, try again shortly")
+
+            job = ReportJob(ticker, key)
+            self._jobs[job.id] = job
+            self._by_key[key] = job
+        self._pool.submit(self._run, job)
+        return job
+
+    def _run(self, job):
+        job.started = time.time()
+        job.status = RUNNING
+        try:
+            artifact = self.build(job.ticker)
+            job.filename, job.report_key, job.size = artifact.filename, artifact.key, len(artifact.pdf)
+            job.status = DONE
+        except Exception as e:
+            print(f"Report job {job.id} for {job.ticker} failed: {str(e)}")
+            job.error = str(e)
+            job.status = FAILED
+        finally:
+            job.finished = time.time()
+
+    def get(self, job_id):
+        """The job with `job_id`, or None if unknown or expired"""
+        with self._lock:
+            self._prune(time.time())
+            return self._jobs.get(job_id)
+
+    def stats(self):
+        with self._lock:
+            counts = {status: 0 for status in (QUEUED, RUNNING, DONE, FAILED)}
+            for job in self._jobs.values():
+                counts[job.status] += 1
+            return {"jobs": len(self._jobs), **counts, "max_pending": self.max_pending}
@@ -0,0 +1,149 @@
+import threading
+from collections import OrderedDict
+import numpy as np
+import pandas as pd
+from helper import ohlcv_store
+from helper.market_data import slice_period
+
+# Weekly, monthly and quarterly OHLCV bars derived from the stored daily bars:
+# open of the first day, highest high, lowest low, close of the last day and
+# total volume. Bars are labelled with the start of their period (Monday,
+# the 1st of the month, the 1st of the quarter), like Yahoo's 1wk/1mo/3mo.
+#
+# Resampled bars are cached per (ticker, interval). When new days are
+# appended only the last (possibly still open) bar is rebuilt and any newer
+# bars are added; a re-adjusted history is resampled from scratch.
+
+INTERVALS = ("1d", "1wk", "1mo", "3mo")
+MAX_SERIES = 512
+
+_series = OrderedDict()
+_lock = threading.Lock()
+
+
+def period_starts(dates, interval):
+    """Start date of the `interval` period containing each datetime64[D] date"""
+    dates = np.asarray(dates, dtype="datetime64[D]")
+    if interval == "1d":
+        return dates
+    if interval == "1wk":
+        # 1970-01-01 was a Thursday: shift so weeks start on Monday
+        return dates - ((dates.astype(np.int64) + 3) % 7).astype("timedelta64[D]")
+    months = dates.astype("datetime64[M]")
+    if interval == "1mo":
+        return months.astype("datetime64[D]")
+    if interval == "3mo":
+        month_numbers = months.astype(np.int64)
+        return (month_numbers - month_numbers % 3).astype("datetime64[M]").astype("datetime64[D]")
+    raise ValueError(f"Unsupported interval: {interval}. Use one of {', '.join(INTERVALS)}")
+
+
+def resample_arrays(dates, values, interval):
+    """
+    Aggregate daily (dates, values) store arrays into `interval` bars.
+    values has the ohlcv_store row layout (Open, High, Low, Close, Volume).
+    Returns (bar start dates, bar values of shape (5, bars)).
+    """
+    starts = period_starts(dates, interval)
+    if interval == "1d" or len(starts) == 0:
+        return starts, np.asarray(values, dtype=np.float64)
+
+    first = np.flatnonzero(np.concatenate(([True], starts[1:] != starts[:-1])))
+    last = np.append(first[1:] - 1, len(starts) - 1)
+    open_, high, low, close, volume = np.asarray(values, dtype=np.float64)
+    bars = np.vstack([
+        open_[first],
+        np.fmax.reduceat(high, first),
+        np.fmin.reduceat(low, first),
+        close[last],
+        np.add.reduceat(np.nan_to_num(volume), first),
+    ])
+    return starts[first], bars
+
+
+def _remember(key, entry):
+    _series[key] = entry
+    _series.move_to_end(key)
+    while len(_series) > MAX_SERIES:
+        _series.popitem(last=False)
+
+
+def bars(symbol, interval="1mo"):
+    """(bar dates, bar values) for `symbol` at `interval`, from the stored daily history"""
+    try:
+        ohlcv_store.update(symbol)
+    except Exception as e:
+        # Resample whatever is on disk if Yahoo is unreachable
+        print(f"Could not refresh stored history for {symbol}: {str(e)}")
+    dates, values = ohlcv_store.load_arrays(symbol)
+    if interval == "1d" or len(dates) == 0:
+        return dates, values
+    close = values[ohlcv_store.COLUMNS.index("Close")]
+
+    key = (symbol, interval)
+    with _lock:
+        cached = _series.get(key)
+        if cached is not None and cached["days"] == len(dates) and cached["last"] == dates[-1] \
+                and cached["last_close"] == close[-1]:
+            _series.move_to_end(key)
+            return cached["dates"], cached["values"]
+
+        # Rebuild only from the start of the last cached bar, unless the days
+        # before it changed (dividend/split re-adjustment)
+        start = 0
+        if cached is not None and 0 < cached["open_from"] <= len(dates) \
+                and dates[cached["open_from"] - 1] == cached["check_date"] \
+                and close[cached["open_from"] - 1] == cached["check_close"]:
+            start = cached["open_from"]
+
+        new_dates, new_values = resample_arrays(dates[start:], values[:, start:], interval)
+        if start:
+            kept = len(cached["dates"]) - 1
+            new_dates = np.concatenate([cached["dates"][:kept], new_dates])
+            new_values = np.concatenate([cached["values"][:, :kept], new_values], axis=1)
+
+        # Daily index where the last (still open) bar begins
+        open_from = int(np.searchsorted(dates, new_dates[-1]))
+        new_dates.setflags(write=False)
+        new_values.setflags(write=False)
+        _remember(key, {
+            "dates": new_dates,
+            "values": new_values,
+            "days": len(dates),
+            "last": dates[-1],
+            "last_close": close[-1],
+            "open_from": open_from,
+            "check_date": dates[open_from - 1] if open_from else None,
+            "check_close": close[open_from - 1] if open_from else None,
+        })
+        return new_dates, new_values
+
+
+def history(symbol, interval="1mo", period="max"):
+    """
+    Stored history for `symbol` as a yfinance-style DataFrame of `interval` bars
+    covering a yfinance-style period. The first bar is the one containing the
+    period's first trading day.
+    """
+    if interval == "1d":
+        return ohlcv_store.history(symbol, period)
+
+    bar_dates, bar_values = bars(symbol, interval)
+    tz = (ohlcv_store.read_meta(symbol) or {}).get("tz")
+    index = pd.DatetimeIndex(bar_dates.astype("datetime64[ns]"), name="Date")
+    if tz:
+        index = index.tz_localize(tz)
+    frame = pd.DataFrame(np.array(bar_values.T), index=index, columns=ohlcv_store.COLUMNS)
+    if period in (None, "max") or frame.empty:
+        return frame
+
+    # Find the first trading day of the period on the daily calendar
+    days, _ = ohlcv_store.load_arrays(symbol)
+    day_index = pd.DatetimeIndex(np.asarray(days).astype("datetime64[ns]"))
+    if tz:
+        day_index = day_index.tz_localize(tz)
+    covered = slice_period(pd.Series(0, index=day_index), period)
+    if covered.empty:
+        return frame.iloc[0:0]
+    first_bar = period_starts(np.array([covered.index[0].date()], dtype="datetime64[D]"), interval)[0]
+    return frame.iloc[np.searchsorted(bar_dates, first_bar):]
@@ -0,0 +1,229 @@
+import ast
+import numpy as np
+from helper import ohlcv_store
+from helper.indicators import compute_indicators
+
+# Technical screen over the whole local universe at once: the closes of every
+# stored ticker are aligned into one (tickers, days) matrix, the indicator
+# engine runs across all rows together, and a filter expression such as
+#
+#     golden_cross and rsi < 40
+#     close > ma200 and change_1m > 10
+#
+# is evaluated column-wise on the latest bar. Only stored history is read;
+# nothing is downloaded, so keep the store fresh separately.
+
+LOOKBACK_DAYS = 260      # enough bars for the 200-day average to warm up
+CROSS_DAYS = 5           # a cross within this many bars counts as "just had"
+MAX_EXPRESSION_LENGTH = 500
+
+_COMPARISONS = {
+    ast.Lt: np.less,
+    ast.LtE: np.less_equal,
+    ast.Gt: np.greater,
+    ast.GtE: np.greater_equal,
+    ast.Eq: np.equal,
+    ast.NotEq: np.not_equal,
+}
+_ARITHMETIC = {
+    ast.Add: np.add,
+    ast.Sub: np.subtract,
+    ast.Mult: np.multiply,
+    ast.Div: np.divide,
+}
+
+
+def _load_matrix(symbols, lookback):
+    """
+    Align the last `lookback` sessions of each ticker into (dates, closes, volumes)
+    arrays. Also returns {symbol: reason} for the tickers that could not be loaded.
+    """
+    series = {}
+    skipped = {}
+    for symbol in symbols:
+        try:
+            dates, values = ohlcv_store.load_arrays(symbol)
+        except FileNotFoundError:
+            skipped[symbol] = "not in the local store"
+            continue
+        except (OSError, ValueError) as e:
+            skipped[symbol] = f"unreadable: {str(e)}"
+            continue
+        if len(dates):
+            series[symbol] = (dates[-lookback:], values[:, -lookback:])
+        else:
+            skipped[symbol] = "no stored history"
+
+    if not series:
+        return [], np.array([], dtype="datetime64[D]"), np.empty((0, 0)), np.empty((0, 0)), skipped
+
+    calendar = np.unique(np.concatenate([dates for dates, _ in series.values()]))[-lookback:]
+    tickers = list(series)
+    closes = np.full((len(tickers), len(calendar)), np.nan)
+    volumes = np.full((len(tickers), len(calendar)), np.nan)
+    last = np.full(len(tickers), -1)
+    close_row, volume_row = ohlcv_store.COLUMNS.index("Close"), ohlcv_store.COLUMNS.index("Volume")
+    for i, symbol in enumerate(tickers):
+        dates, values = series[symbol]
+        keep = dates >= calendar[0]
+        columns = np.searchsorted(calendar, dates[keep])
+        closes[i, columns] = values[close_row, keep]
+        volumes[i, columns] = values[volume_row, keep]
+        if len(columns):
+            last[i] = columns[-1]
+
+    # Carry closes over days a ticker did not trade (suspensions), but never past
+    # its own last stored bar: a ticker whose history stops early has no latest
+    # close and matches nothing. Late listings stay NaN before their first bar.
+    filled = np.where(np.isnan(closes), 0, np.arange(closes.shape[1]))
+    np.maximum.accumulate(filled, axis=1, out=filled)
+    closes = np.take_along_axis(closes, filled, axis=1)
+    closes[np.arange(closes.shape[1]) > last[:, None]] = np.nan
+    return tickers, calendar, closes, np.nan_to_num(volumes), skipped
+
+
+def _pct_change(closes, bars):
+    if closes.shape[1] <= bars:
+        return np.full(closes.shape[0], np.nan)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return (closes[:, -1] / closes[:, -1 - bars] - 1) * 100
+
+
+def _recent_cross(fast, slow, days, upward):
+    """True for rows where `fast` crossed `slow` within the last `days` bars"""
+    above = fast > slow
+    below = fast < slow
+    if upward:
+        crossed = below[:, :-1] & above[:, 1:]
+    else:
+        crossed = above[:, :-1] & below[:, 1:]
+    return crossed[:, -days:].any(axis=1)
+
+
+def screen_variables(closes, volumes, cross_days=CROSS_DAYS):
+    """Latest-bar values (one per ticker row) that filter expressions can refer to"""
+    ind = compute_indicators(closes, volumes)
+    variables = {name: values[:, -1] for name, values in ind.items()}
+    variables.update({
+        "close": closes[:, -1],
+        "volume": volumes[:, -1],
+        "change_1d": _pct_change(closes, 1),
+        "change_1w": _pct_change(closes, 5),
+        "change_1m": _pct_change(closes, 21),
+        "high_52w": np.nanmax(closes[:, -252:], axis=1),
+        "low_52w": np.nanmin(closes[:, -252:], axis=1),
+        # Same 20/50-day crosses the stock report flags
+        "golden_cross": _recent_cross(ind["ma20"], ind["ma50"], cross_days, upward=True),
+        "death_cross": _recent_cross(ind["ma20"], ind["ma50"], cross_days, upward=False),
+    })
+    return variables
+
+
+def _evaluate(node, variables):
+    if isinstance(node, ast.Expression):
+        return _evaluate(node.body, variables)
+    if isinstance(node, ast.BoolOp):
+        values = [np.asarray(_evaluate(v, variables), dtype=bool) for v in node.values]
+        combine = np.logical_and if isinstance(node.op, ast.And) else np.logical_or
+        result = values[0]
+        for value in values[1:]:
+            result = combine(result, value)
+        return result
+    if isinstance(node, ast.UnaryOp) and isinstance(node.op, ast.Not):
+        return np.logical_not(np.asarray(_evaluate(node.operand, variables), dtype=bool))
+    if isinstance(node, ast.UnaryOp) and isinstance(node.op, (ast.USub, ast.UAdd)):
+        value = _evaluate(node.operand, variables)
+        return -value if isinstance(node.op, ast.USub) else value
+    if isinstance(node, ast.Compare):
+        left = _evaluate(node.left, variables)
+        result = True
+        for op, comparator in zip(node.ops, node.comparators):
+            if type(op) not in _COMPARISONS:
+                raise ValueError(f"Unsupported comparison: {type(op).__name__}")
+            right = _evaluate(comparator, variables)
+            result = np.logical_and(result, _COMPARISONS[type(op)](left, right))
+            left = right
+        return result
+    if isinstance(node, ast.BinOp) and type(node.op) in _ARITHMETIC:
+        with np.errstate(divide="ignore", invalid="ignore"):
+            return _ARITHMETIC[type(node.op)](_evaluate(node.left, variables), _evaluate(node.right, variables))
+    if isinstance(node, ast.Name):
+        if node.id not in variables:
+            raise ValueError(f"Unknown field '{node.id}'. Available: {', '.join(sorted(variables))}")
+        return variables[node.id]
+    if isinstance(node, ast.Constant) and isinstance(node.value, (int, float, bool)):
+        return node.value
+    raise ValueError(f"Unsupported expression element: {type(node).__name__}")
+
+
+def parse_filter(expression):
+    """Parse a filter expression, raising ValueError if it is not valid Python syntax"""
+    if len(expression) > MAX_EXPRESSION_LENGTH:
+        raise ValueError("Filter expression is too long")
+    try:
+        return ast.parse(expression, mode="eval")
+    except SyntaxError as e:
+        raise ValueError(f"Invalid filter expression: {e.msg}")
+
+
+def evaluate_filter(expression, variables):
+    """
+    Evaluate a filter expression (text or parse_filter() tree) over per-ticker
+    arrays. Only field names, numbers, arithmetic, comparisons and and/or/not
+    are allowed. Comparisons involving missing (NaN) values are False.
+    """
+    tree = parse_filter(expression) if isinstance(expression, str) else expression
+    rows = len(next(iter(variables.values()))) if variables else 0
+    return np.broadcast_to(np.asarray(_evaluate(tree, variables), dtype=bool), (rows,))
+
+
+def _json_value(value):
+    if isinstance(value, (bool, np.bool_)):
+        return bool(value)
+    value = float(value)
+    return None if np.isnan(value) else round(value, 4)
+
+
+def screen(expression, symbols=None, sort_by=None, descending=True, limit=100,
+           cross_days=CROSS_DAYS, lookback=LOOKBACK_DAYS):
+    """
+    Tickers whose latest bar matches `expression`, with their screen fields.
+
+    symbols: tickers to screen, as stored (e.g. "TCS.NS"); defaults to every
+             ticker in the local store
+    sort_by: optional field to order matches by
+
+    Requested tickers that could not be loaded are listed under "skipped" with
+    the reason. Raises ValueError for a bad expression, sort field or limit.
+    """
+    tree = parse_filter(expression)
+    if limit <= 0:
+        raise ValueError("limit must be a positive number")
+    symbols = ohlcv_store.stored_symbols() if symbols is None else list(dict.fromkeys(symbols))
+    symbols = [s for s in symbols if not s.startswith("^")]
+    tickers, calendar, closes, volumes, skipped = _load_matrix(symbols, lookback)
+    if not tickers:
+        return {"as_of": None, "universe_size": 0, "match_count": 0, "matches": [], "skipped": skipped}
+
+    variables = screen_variables(closes, volumes, cross_days)
+    if sort_by is not None and sort_by not in variables:
+        raise ValueError(f"Unknown sort field '{sort_by}'")
+    mask = evaluate_filter(tree, variables)
+    rows = np.flatnonzero(mask)
+
+    if sort_by is not None:
+        keys = np.nan_to_num(variables[sort_by][rows].astype(float), nan=-np.inf if descending else np.inf)
+        order = np.argsort(-keys if descending else keys, kind="stable")
+        rows = rows[order]
+
+    matches = [
+        {"ticker": tickers[row], **{name: _json_value(values[row]) for name, values in sorted(variables.items())}}
+        for row in rows[:limit]
+    ]
+    return {
+        "as_of": str(calendar[-1]),
+        "universe_size": len(tickers),
+        "match_count": len(rows),
+        "matches": matches,
+        "skipped": skipped,
+    }
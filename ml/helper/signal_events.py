@@ -0,0 +1,170 @@
+import json
+import os
+import threading
+import numpy as np
+from helper import ohlcv_store
+from helper.indicators import bollinger, rsi, sma
+
+# Per-ticker index of technical signal events over the entire stored history,
+# saved next to the OHLCV store as <SYMBOL>.events.json:
+#   golden_cross / death_cross     - 20-day SMA crossing above / below the 50-day SMA
+#   rsi_overbought / rsi_oversold  - 14-day RSI crossing above 70 / below 30
+#   bollinger_upper / bollinger_lower - close breaking out above / below the 20-day, 2-std bands
+#   monthly_move                   - calendar month close-to-close change beyond +/-10%
+# Each event is {"date", "type", "close", "value"}. After the first full scan only
+# the bars added since the last update are scanned (plus a warm-up for the windows).
+
+EVENT_TYPES = (
+    "golden_cross", "death_cross",
+    "rsi_overbought", "rsi_oversold",
+    "bollinger_upper", "bollinger_lower",
+    "monthly_move",
+)
+RSI_OVERBOUGHT = 70
+RSI_OVERSOLD = 30
+MONTHLY_MOVE_PCT = 10
+# Longest window among the indicators scanned: an incremental scan re-reads this many earlier bars
+WARMUP_BARS = 50
+
+_lock = threading.Lock()
+
+
+def _index_path(symbol):
+    return os.path.join(ohlcv_store.STORE_DIR, symbol.replace("^", "_") + ".events.json")
+
+
+def _read_index(symbol):
+    path = _index_path(symbol)
+    if not os.path.exists(path):
+        return None
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def _event(dates, closes, i, kind, value):
+    return {
+        "date": str(dates[i]),
+        "type": kind,
+        "close": round(float(closes[i]), 4),
+        "value": None if value is None or np.isnan(value) else round(float(value), 4),
+    }
+
+
+def _crossings(a, b, upward):
+    """Indices i where `a` crosses `b` between bar i-1 and bar i (strictly, NaNs never cross)"""
+    if upward:
+        hits = (a[:-1] < b[:-1]) & (a[1:] > b[1:])
+    else:
+        hits = (a[:-1] > b[:-1]) & (a[1:] < b[1:])
+    return np.flatnonzero(hits) + 1
+
+
+def _scan(dates, closes, start):
+    """Events on bars from index `start` onwards (windows warmed up on earlier bars)"""
+    offset = max(0, start - WARMUP_BARS)
+    d, c = dates[offset:], closes[offset:]
+    ma20, ma50 = sma(c, 20), sma(c, 50)
+    rsi14 = rsi(c, 14)
+    _, upper, lower = bollinger(c, 20, 2)
+    overbought = np.full_like(c, RSI_OVERBOUGHT)
+    oversold = np.full_like(c, RSI_OVERSOLD)
+
+    found = []
+    for kind, indices, values in (
+        ("golden_cross", _crossings(ma20, ma50, True), ma50),
+        ("death_cross", _crossings(ma20, ma50, False), ma50),
+        ("rsi_overbought", _crossings(rsi14, overbought, True), rsi14),
+        ("rsi_oversold", _crossings(rsi14, oversold, False), rsi14),
+        ("bollinger_upper", _crossings(c, upper, True), upper),
+        ("bollinger_lower", _crossings(c, lower, False), lower),
+    ):
+        found.extend(_event(d, c, i, kind, values[i]) for i in indices if i + offset >= start)
+
+    # Month-end closes; the current month is reported as it stands so far
+    months = dates.astype("datetime64[M]")
+    month_ends = np.append(np.flatnonzero(months[1:] != months[:-1]), len(dates) - 1)
+    first_month = months[start] if start < len(dates) else None
+    for prev, end in zip(month_ends[:-1], month_ends[1:]):
+        if first_month is None or months[end] < first_month:
+            continue
+        change = (closes[end] / closes[prev] - 1) * 100
+        if abs(change) > MONTHLY_MOVE_PCT:
+            found.append(_event(dates, closes, end, "monthly_move", change))
+
+    found.sort(key=lambda e: (e["date"], EVENT_TYPES.index(e["type"])))
+    return found
+
+
+def update(symbol):
+    """
+    Bring the event index for `symbol` up to date with its stored history and return it.
+
+    The newest stored bar may still be forming, so it is rescanned on the next
+    update together with any new bars (and monthly moves from its month are
+    recomputed). The index is rebuilt from scratch if the stored closes were
+    re-adjusted for dividends or splits since the last scan.
+    """
+    with _lock:
+        dates, values = ohlcv_store.load_arrays(symbol)
+        closes = np.asarray(values[ohlcv_store.COLUMNS.index("Close")])
+        if len(dates) == 0:
+            return {"last": None, "events": []}
+
+        index = _read_index(symbol)
+        start, events = 0, []
+        if index is not None and index.get("last"):
+            position = int(np.searchsorted(dates, np.datetime64(index["last"])))
+            if position < len(dates) and str(dates[position]) == index["last"] and position > 0 \
+                    and float(closes[position - 1]) == index["prev_close"]:
+                if position == len(dates) - 1 and float(closes[position]) == index["close"]:
+                    return index
+                start = position
+                month = str(dates[start].astype("datetime64[M]"))
+                events = [
+                    e for e in index["events"]
+                    if e["date"] < index["last"] and not (e["type"] == "monthly_move" and e["date"] >= month)
+                ]
+
+        index = {
+            "last": str(dates[-1]),
+            "close": float(closes[-1]),
+            "prev_close": float(closes[-2]) if len(closes) > 1 else None,
+            "events": events + _scan(dates, closes, start),
+        }
+        os.makedirs(ohlcv_store.STORE_DIR, exist_ok=True)
+        ohlcv_store.save_atomic(_index_path(symbol), lambda f: f.write(json.dumps(index).encode("utf-8")))
+        return index
+
+
+def events(symbol, types=None, since=None, refresh=True):
+    """Events for `symbol` in date order, optionally filtered by type and start date (YYYY-MM-DD)"""
+    if refresh:
+        ohlcv_store.update(symbol)
+    found = update(symbol)["events"]
+    if types is not None:
+        found = [e for e in found if e["type"] in types]
+    if since is not None:
+        found = [e for e in found if e["date"] >= str(since)]
+    return found
+
+
+def last_signals(symbol, n=5, types=None, refresh=True):
+    """The `n` most recent events for `symbol`, newest first"""
+    return events(symbol, types=types, refresh=refresh)[-n:][::-1]
+
+
+def describe_event(event):
+    """One-line human readable description of an event"""
+    descriptions = {
+        "golden_cross": "Golden cross (20-day MA crossed above 50-day MA)",
+        "death_cross": "Death cross (20-day MA crossed below 50-day MA)",
+        "rsi_overbought": f"RSI crossed above {RSI_OVERBOUGHT} (overbought)",
+        "rsi_oversold": f"RSI crossed below {RSI_OVERSOLD} (oversold)",
+        "bollinger_upper": "Close broke above the upper Bollinger band",
+        "bollinger_lower": "Close broke below the lower Bollinger band",
+        "monthly_move": f"Monthly move of {event['value']:+.2f}%" if event.get("value") is not None else "Large monthly move",
+    }
+    return f"{event['date']}: {descriptions.get(event['type'], event['type'])} at ₹{event['close']:.2f}"
@@ -1,10 +1,15 @@
-import yfinance as yf
+from helper.market_snapshot import MarketSnapshot
+from helper.indicator_cache import indicator_cache, indicator_key
+from helper.indicators import rsi, sma
 
 # Get monthly stock information formatted for LLM consumption with complete OHLC data
-def get_stock_info_for_month(ticker):
+def get_stock_info_for_month(ticker, snapshot=None):
     """Get monthly stock information formatted for LLM consumption with complete OHLC data"""
+    if snapshot is None:
+        snapshot = MarketSnapshot(ticker)
+    
     # Get the raw data
-    stock_data = yf.Ticker(ticker).history(period="1mo")
+    stock_data = snapshot.history("1mo")
     
     # Calculate key metrics
     current_price = stock_data['Close'].iloc[-1]
@@ -19,7 +24,7 @@ def get_stock_info_for_month(ticker):
     
     # Add company info if available
     try:
-        ticker_info = yf.Ticker(ticker).info
+        ticker_info = snapshot.info
         company_name = ticker_info.get('shortName', ticker)
         market_cap = ticker_info.get('marketCap', 'N/A')
         if market_cap != 'N/A':
@@ -58,19 +63,21 @@ RECENT TRADING DATA (Last 5 days with OHLC):
     # Add technical indicators
     summary += "\nTECHNICAL INDICATORS:\n"
     
+    # Cached per ticker and last bar, so repeated analyses skip the computation
+    def compute():
+        close = stock_data['Close'].to_numpy(dtype=float)
+        ma7, rsi_14 = sma(close, 7), rsi(close)
+        return {'ma7': ma7, 'rsi': rsi_14}, {'ma7': ma7[-1] if len(close) else None, 'rsi': rsi_14[-1] if len(close) else None}
+    
+    _, latest = indicator_cache.get_or_compute(indicator_key(ticker, stock_data, 'month-summary'), compute)
+    
     # 7-day moving average (if we have enough data)
     if len(stock_data) >= 7:
-        ma7 = stock_data['Close'].rolling(window=7).mean().iloc[-1]
-        summary += f"- 7-Day Moving Average: ₹{ma7:.2f}\n"
+        summary += f"- 7-Day Moving Average: ₹{latest['ma7']:.2f}\n"
     
     # RSI calculation (simplified)
     try:
-        delta = stock_data['Close'].diff()
-        gain = delta.where(delta > 0, 0).rolling(window=14).mean()
-        loss = -delta.where(delta < 0, 0).rolling(window=14).mean()
-        rs = gain / loss
-        rsi = 100 - (100 / (1 + rs)).iloc[-1]
-        summary += f"- 14-Day RSI: {rsi:.2f}\n"
+        summary += f"- 14-Day RSI: {latest['rsi']:.2f}\n"
     except:
         pass
     
@@ -1,6 +1,14 @@
-import requests
 from bs4 import BeautifulSoup
+import asyncio
 import re
+from helper import http_client
+from helper.single_flight import SingleFlight
+
+# Concurrent requests for the same news query share one Google fetch
+_news_fetches = SingleFlight()
+
+# Used in place of the news section when Google News can't be reached in time
+NEWS_UNAVAILABLE = "Recent News:\n\nNews is currently unavailable.\n"
 
 # Scrap top 5 google news for given company name
 # Helper function to get google news url
@@ -13,12 +21,8 @@ def google_query(search_term):
     url = re.sub(r"\s", "+", url)
     return url
 
-# Get recent stock news from google news
-def get_recent_stock_news(company_name):
-    headers={'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/102.0.0.0 Safari/537.36'}
-
-    g_query=google_query(company_name)
-    res=requests.get(g_query,headers=headers).text
+# Extract the top 5 headlines from a Google News results page
+def parse_news(res):
     soup=BeautifulSoup(res,"html.parser")
     news=[]
     for n in soup.find_all("div","n0jPhd ynAwRc tNxQIb nDgy9d"):
@@ -38,4 +42,27 @@ def get_recent_stock_news(company_name):
         news_string+=f"{i+1}. {n}\n"
     top5_news="Recent News:\n\n"+news_string
     
-    return top5_news
\ No newline at end of file
+    return top5_news
+
+# Get recent stock news from google news
+def get_recent_stock_news(company_name):
+    g_query=google_query(company_name)
+    res=_news_fetches.do(g_query, lambda: http_client.fetch_text(g_query))
+    return parse_news(res)
+
+# Async variant for batch jobs running their own event loop and AsyncHttpClient
+async def get_recent_stock_news_async(company_name, client):
+    res=await client.get_text(google_query(company_name))
+    return parse_news(res)
+
+# News for many companies at once: the fetches overlap on the shared event loop
+# (Google's per-host limit still applies) instead of blocking a thread each.
+# Companies whose news can't be fetched get NEWS_UNAVAILABLE.
+def get_recent_stock_news_many(company_names):
+    async def gather():
+        return await asyncio.gather(
+            *(get_recent_stock_news_async(name, http_client.shared_client) for name in company_names),
+            return_exceptions=True,
+        )
+    results=http_client.run(gather())
+    return {name: NEWS_UNAVAILABLE if isinstance(res, Exception) else res for name, res in zip(company_names, results)}
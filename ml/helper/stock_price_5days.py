@@ -1,11 +1,10 @@
-import yfinance as yf
+from helper.market_snapshot import MarketSnapshot, nse_symbol
 # Open,Close,Volume for last 5 days for given ticker
-def get_stock_price(ticker,history=5):
-    if "." in ticker:
-        ticker=ticker.split(".")[0]
-    ticker=ticker+".NS"
-    stock = yf.Ticker(ticker)
-    df = stock.history(period="1y")
+def get_stock_price(ticker,history=5,snapshot=None):
+    ticker=nse_symbol(ticker)
+    if snapshot is None:
+        snapshot=MarketSnapshot(ticker)
+    df = snapshot.history("1y")
     df=df[["Open","Close","Volume"]]
     df.index=[str(x).split()[0] for x in list(df.index)]
     df.index.rename("Date",inplace=True)
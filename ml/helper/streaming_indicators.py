@@ -0,0 +1,385 @@
+import json
+import math
+import os
+import numpy as np
+from helper import ohlcv_store
+from helper.single_flight import SingleFlight
+
+# Indicator state that advances one bar at a time in constant time, for live
+# and intraday views that would otherwise recompute a full year of rolling
+# windows on every new bar. Every state round-trips through to_dict() /
+# state_from_dict() so it can be persisted and resumed after a restart.
+#
+#     rsi = WilderRSIState(14)
+#     for close in closes:
+#         value = rsi.update(close)    # None until the window is filled
+#
+# Values before warm-up are None (not NaN) so the dicts stay valid JSON.
+
+# Concurrent requests for the same symbol share one fold-and-save of its state
+_folds = SingleFlight()
+
+
+def _number(value):
+    return None if value is None or math.isnan(value) else value
+
+
+class EMAState:
+    """Exponential moving average with adjust=False, seeded by the first value"""
+
+    def __init__(self, span):
+        self.span = span
+        self.alpha = 2.0 / (span + 1.0)
+        self.value = None
+
+    def update(self, x):
+        x = float(x)
+        self.value = x if self.value is None else self.alpha * x + (1 - self.alpha) * self.value
+        return self.value
+
+    def to_dict(self):
+        return {"type": "ema", "span": self.span, "value": self.value}
+
+    @classmethod
+    def from_dict(cls, data):
+        state = cls(data["span"])
+        state.value = data["value"]
+        return state
+
+
+class MACDState:
+    """MACD line, signal line and histogram from fast/slow/signal EMAs"""
+
+    def __init__(self, fast=12, slow=26, signal=9):
+        self.fast = EMAState(fast)
+        self.slow = EMAState(slow)
+        self.signal = EMAState(signal)
+        self.value = None
+
+    def update(self, x):
+        line = self.fast.update(x) - self.slow.update(x)
+        signal = self.signal.update(line)
+        self.value = {"macd": line, "signal": signal, "histogram": line - signal}
+        return self.value
+
+    def to_dict(self):
+        return {
+            "type": "macd",
+            "fast": self.fast.to_dict(),
+            "slow": self.slow.to_dict(),
+            "signal": self.signal.to_dict(),
+            "value": self.value,
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        state = cls()
+        state.fast = EMAState.from_dict(data["fast"])
+        state.slow = EMAState.from_dict(data["slow"])
+        state.signal = EMAState.from_dict(data["signal"])
+        state.value = data["value"]
+        return state
+
+
+class WilderRSIState:
+    """
+    RSI with Wilder's smoothing: the first `window` changes are averaged,
+    after that avg = (avg * (window - 1) + change) / window.
+    """
+
+    def __init__(self, window=14):
+        self.window = window
+        self.prev = None
+        self.count = 0
+        self.avg_gain = 0.0
+        self.avg_loss = 0.0
+        self.value = None
+
+    def update(self, x):
+        x = float(x)
+        if self.prev is None:
+            self.prev = x
+            return None
+        change, self.prev = x - self.prev, x
+        gain, loss = max(change, 0.0), max(-change, 0.0)
+
+        if self.count < self.window:
+            # Warm-up: running simple average of the first `window` changes
+            self.count += 1
+            self.avg_gain += (gain - self.avg_gain) / self.count
+            self.avg_loss += (loss - self.avg_loss) / self.count
+            if self.count < self.window:
+                return None
+        else:
+            self.avg_gain = (self.avg_gain * (self.window - 1) + gain) / self.window
+            self.avg_loss = (self.avg_loss * (self.window - 1) + loss) / self.window
+
+        if self.avg_loss == 0:
+            self.value = 100.0 if self.avg_gain > 0 else 50.0
+        else:
+            self.value = 100 - 100 / (1 + self.avg_gain / self.avg_loss)
+        return self.value
+
+    def to_dict(self):
+        return {
+            "type": "wilder_rsi",
+            "window": self.window,
+            "prev": self.prev,
+            "count": self.count,
+            "avg_gain": self.avg_gain,
+            "avg_loss": self.avg_loss,
+            "value": self.value,
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        state = cls(data["window"])
+        state.prev = data["prev"]
+        state.count = data["count"]
+        state.avg_gain = data["avg_gain"]
+        state.avg_loss = data["avg_loss"]
+        state.value = data["value"]
+        return state
+
+
+class RollingStatsState:
+    """
+    Rolling mean and sample standard deviation over the last `window` values.
+    A ring buffer holds the window; the mean and sum of squared deviations are
+    updated with Welford's method as values enter and leave, which avoids the
+    cancellation error of running sums of squares on large prices.
+    """
+
+    def __init__(self, window=20):
+        self.window = window
+        self.buffer = [0.0] * window
+        self.head = 0
+        self.count = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+
+    def update(self, x):
+        x = float(x)
+        if self.count < self.window:
+            self.count += 1
+            delta = x - self.mean
+            self.mean += delta / self.count
+            self.m2 += delta * (x - self.mean)
+        else:
+            old = self.buffer[self.head]
+            old_mean = self.mean
+            self.mean += (x - old) / self.window
+            self.m2 += (x - old) * (x - self.mean + old - old_mean)
+            self.m2 = max(self.m2, 0.0)
+        self.buffer[self.head] = x
+        self.head = (self.head + 1) % self.window
+        return self.value
+
+    @property
+    def full(self):
+        return self.count == self.window
+
+    @property
+    def std(self):
+        if not self.full or self.window < 2:
+            return None
+        return math.sqrt(self.m2 / (self.window - 1))
+
+    @property
+    def value(self):
+        if not self.full:
+            return None
+        return {"mean": self.mean, "std": self.std}
+
+    def to_dict(self):
+        return {
+            "type": "rolling_stats",
+            "window": self.window,
+            "buffer": list(self.buffer),
+            "head": self.head,
+            "count": self.count,
+            "mean": self.mean,
+            "m2": self.m2,
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        state = cls(data["window"])
+        state.buffer = list(data["buffer"])
+        state.head = data["head"]
+        state.count = data["count"]
+        state.mean = data["mean"]
+        state.m2 = data["m2"]
+        return state
+
+
+class SMACrossState:
+    """
+    Fast/slow simple moving averages and their crossovers. update() returns
+    "golden" when the fast SMA crosses above the slow one, "death" when it
+    crosses below, otherwise None.
+    """
+
+    def __init__(self, fast=20, slow=50):
+        self.fast = RollingStatsState(fast)
+        self.slow = RollingStatsState(slow)
+        self.above = None
+        self.value = None
+
+    def update(self, x):
+        self.fast.update(x)
+        self.slow.update(x)
+        self.value = None
+        if self.fast.full and self.slow.full and self.fast.mean != self.slow.mean:
+            above = self.fast.mean > self.slow.mean
+            if self.above is not None and above != self.above:
+                self.value = "golden" if above else "death"
+            self.above = above
+        return self.value
+
+    def to_dict(self):
+        return {
+            "type": "sma_cross",
+            "fast": self.fast.to_dict(),
+            "slow": self.slow.to_dict(),
+            "above": self.above,
+            "value": self.value,
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        state = cls()
+        state.fast = RollingStatsState.from_dict(data["fast"])
+        state.slow = RollingStatsState.from_dict(data["slow"])
+        state.above = data["above"]
+        state.value = data["value"]
+        return state
+
+
+STATE_TYPES = {
+    "ema": EMAState,
+    "macd": MACDState,
+    "wilder_rsi": WilderRSIState,
+    "rolling_stats": RollingStatsState,
+    "sma_cross": SMACrossState,
+}
+
+
+def state_from_dict(data):
+    """Rebuild any indicator state from its to_dict() output"""
+    return STATE_TYPES[data["type"]].from_dict(data)
+
+
+def default_states():
+    """The indicator set shown on live views"""
+    return {
+        "ema20": EMAState(20),
+        "macd": MACDState(12, 26, 9),
+        "rsi": WilderRSIState(14),
+        "bollinger": RollingStatsState(20),
+        "cross": SMACrossState(20, 50),
+    }
+
+
+def _snapshot(states, date, crosses):
+    bollinger = states["bollinger"].value
+    macd = states["macd"].value or {}
+    return {
+        "date": date,
+        "ema20": _number(states["ema20"].value),
+        "macd": _number(macd.get("macd")),
+        "macd_signal": _number(macd.get("signal")),
+        "macd_hist": _number(macd.get("histogram")),
+        "rsi": _number(states["rsi"].value),
+        "bb_mid": bollinger["mean"] if bollinger else None,
+        "bb_upper": bollinger["mean"] + 2 * bollinger["std"] if bollinger else None,
+        "bb_lower": bollinger["mean"] - 2 * bollinger["std"] if bollinger else None,
+        "ma20": states["cross"].fast.mean if states["cross"].fast.full else None,
+        "ma50": states["cross"].slow.mean if states["cross"].slow.full else None,
+        "last_cross": crosses,
+    }
+
+
+def _state_path(symbol):
+    return os.path.join(ohlcv_store.STORE_DIR, symbol.replace("^", "_") + ".stream.json")
+
+
+def _load_state(symbol):
+    path = _state_path(symbol)
+    if not os.path.exists(path):
+        return None
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def _advance(symbol):
+    """
+    Fold the closed bars of `symbol` added since the saved state into it and
+    persist it. Returns (dates, closes, states, last_cross) with the states
+    positioned just before the newest bar, or None without stored history.
+    """
+    dates, values = ohlcv_store.load_arrays(symbol)
+    closes = values[ohlcv_store.COLUMNS.index("Close")]
+    if len(dates) == 0:
+        return None
+
+    saved = _load_state(symbol)
+    start = 0
+    states, last_cross = default_states(), None
+    if saved is not None:
+        position = np.searchsorted(dates, np.datetime64(saved["last"]))
+        if position < len(dates) - 1 and str(dates[position]) == saved["last"] and closes[position] == saved["close"]:
+            states = {name: state_from_dict(data) for name, data in saved["states"].items()}
+            last_cross = saved["last_cross"]
+            start = position + 1
+
+    # Fold in the closed bars (everything but the newest) and persist
+    closed = len(dates) - 1
+    for i in range(start, closed):
+        cross = states["cross"].update(closes[i])
+        for name in ("ema20", "macd", "rsi", "bollinger"):
+            states[name].update(closes[i])
+        if cross:
+            last_cross = {"type": cross, "date": str(dates[i])}
+
+    if closed > 0 and start < closed:
+        payload = {
+            "last": str(dates[closed - 1]),
+            "close": float(closes[closed - 1]),
+            "states": {name: state.to_dict() for name, state in states.items()},
+            "last_cross": last_cross,
+        }
+        os.makedirs(ohlcv_store.STORE_DIR, exist_ok=True)
+        ohlcv_store.save_atomic(_state_path(symbol), lambda f: f.write(json.dumps(payload).encode("utf-8")))
+    return dates, closes, states, last_cross
+
+
+def live_indicators(symbol):
+    """
+    Latest indicator values for `symbol` from persisted streaming state, or
+    None when there is no stored history.
+
+    Closed bars are folded into the state saved next to the OHLCV store, so
+    each call only feeds the bars added since the previous one; concurrent
+    calls for a symbol share one fold, so the saved state has a single
+    writer. The newest bar may still be forming intraday: it is applied to a
+    copy and never saved. The state is rebuilt from the full history when the
+    stored bars were re-adjusted (dividends, splits) since it was saved.
+    """
+    ohlcv_store.update(symbol)
+    advanced = _folds.do(symbol, lambda: _advance(symbol))
+    if advanced is None:
+        return None
+    dates, closes, states, last_cross = advanced
+
+    # Apply the newest bar to a throwaway copy
+    live = {name: state_from_dict(state.to_dict()) for name, state in states.items()}
+    cross = live["cross"].update(closes[-1])
+    for name in ("ema20", "macd", "rsi", "bollinger"):
+        live[name].update(closes[-1])
+    if cross:
+        last_cross = {"type": cross, "date": str(dates[-1])}
+    return _snapshot(live, str(dates[-1]), last_cross)
@@ -0,0 +1,139 @@
+import os
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from datetime import time as dtime
+from zoneinfo import ZoneInfo
+from helper.single_flight import SingleFlight
+
+# NSE trading session (exchange holidays are not tracked, only weekends)
+IST = ZoneInfo("Asia/Kolkata")
+NSE_OPEN = dtime(9, 15)
+NSE_CLOSE = dtime(15, 30)
+
+# Expiry classes:
+#   profile      - name, sector, description, officers... (static .info fields): kept for days
+#   fundamentals - financial statements: kept until the next quarterly results deadline
+#   quote        - prices and quote-grade .info fields (market cap, P/E, 52-week range):
+#                  a minute while NSE is open, until the next open once it closes
+PROFILE_TTL = timedelta(days=3)
+QUOTE_TTL = timedelta(seconds=60)
+EXPIRY_CLASSES = ("profile", "fundamentals", "quote")
+
+
+def is_market_open(now=None):
+    """True if NSE is in its regular trading session at `now` (IST)"""
+    now = now or datetime.now(IST)
+    return now.weekday() < 5 and NSE_OPEN <= now.time() < NSE_CLOSE
+
+
+def next_market_open(now=None):
+    """Start of the next NSE trading session after `now`"""
+    now = now or datetime.now(IST)
+    day = now.date()
+    if now.time() >= NSE_OPEN:
+        day += timedelta(days=1)
+    while day.weekday() >= 5:
+        day += timedelta(days=1)
+    return datetime.combine(day, NSE_OPEN, tzinfo=IST)
+
+
+def next_results_deadline(now=None):
+    """
+    Next date by which listed companies must publish quarterly results:
+    45 days after the quarter ends, 60 days for the March (annual) quarter.
+    """
+    now = now or datetime.now(IST)
+    for year in (now.year, now.year + 1):
+        for month, day in ((2, 14), (5, 30), (8, 14), (11, 14)):
+            deadline = datetime(year, month, day, tzinfo=IST) + timedelta(days=1)
+            if deadline > now:
+                return deadline
+
+
+def expires_at(expiry_class, now=None):
+    """Absolute expiry time for an entry of `expiry_class` stored at `now`"""
+    now = now or datetime.now(IST)
+    if expiry_class == "profile":
+        return now + PROFILE_TTL
+    if expiry_class == "fundamentals":
+        return next_results_deadline(now)
+    if expiry_class == "quote":
+        if is_market_open(now):
+            return min(now + QUOTE_TTL, datetime.combine(now.date(), NSE_CLOSE, tzinfo=IST))
+        return next_market_open(now)
+    raise ValueError(f"Unknown expiry class: {expiry_class}")
+
+
+class TTLCache:
+    """
+    Thread-safe LRU cache whose entries expire according to their expiry class.
+    Concurrent misses for the same key are coalesced into a single fetch.
+    Keeps hit/miss/eviction counters (overall and per class) for sizing.
+    """
+
+    def __init__(self, maxsize=1024):
+        self.maxsize = maxsize
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._stats = {name: {"hits": 0, "misses": 0} for name in EXPIRY_CLASSES}
+        self.evictions = 0
+        self._flights = SingleFlight()
+
+    def get(self, key, expiry_class, default=None):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[1] > time.time():
+                self._entries.move_to_end(key)
+                self._stats[expiry_class]["hits"] += 1
+                return entry[0]
+            if entry is not None:
+                del self._entries[key]
+            self._stats[expiry_class]["misses"] += 1
+            return default
+
+    def set(self, key, value, expiry_class):
+        expiry = expires_at(expiry_class).timestamp()
+        with self._lock:
+            self._entries[key] = (value, expiry)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def get_or_fetch(self, key, expiry_class, fetch):
+        """Return the cached value for `key`, calling `fetch()` and caching its result on a miss"""
+        missing = object()
+        value = self.get(key, expiry_class, missing)
+        if value is not missing:
+            return value
+
+        def fetch_and_store():
+            result = fetch()
+            self.set(key, result, expiry_class)
+            return result
+
+        return self._flights.do(key, fetch_and_store)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        with self._lock:
+            hits = sum(s["hits"] for s in self._stats.values())
+            misses = sum(s["misses"] for s in self._stats.values())
+            return {
+                "size": len(self._entries),
+                "maxsize": self.maxsize,
+                "hits": hits,
+                "misses": misses,
+                "hit_rate": hits / (hits + misses) if hits + misses else 0.0,
+                "evictions": self.evictions,
+                "by_class": {name: dict(s) for name, s in self._stats.items()},
+            }
+
+
+# Shared cache for Yahoo Finance payloads
+market_cache = TTLCache(maxsize=int(os.getenv("MARKET_CACHE_SIZE", "2048")))
@@ -1,7 +1,6 @@
 import os
 from bs4 import BeautifulSoup
 import warnings
-import yfinance as yf
 from dotenv import load_dotenv
 from langchain_core.prompts import ChatPromptTemplate
 from langchain_openai import ChatOpenAI
@@ -12,18 +11,25 @@ GROQ_API_KEY = os.getenv("GROQ_API_KEY")
 warnings.filterwarnings("ignore")
 
 from helper.stock_price_5days import get_stock_price
-from helper.stock_news import get_recent_stock_news
+from helper.stock_news import get_recent_stock_news, NEWS_UNAVAILABLE
 from helper.financial_statements import get_financial_statements
 from helper.stock_info_for_month import get_stock_info_for_month
+from helper.market_snapshot import MarketSnapshot, nse_symbol
+from helper.fan_out import fan_out
 
     
 def stock_analysis(ticker):
-    financial_statements = get_financial_statements(ticker)
-    news = get_recent_stock_news(ticker)
-    stock_price_5days = get_stock_price(ticker)
-    stock_info_for_month = get_stock_info_for_month(ticker)
+    # One snapshot per request so the helpers share the Yahoo round trips
+    snapshot = MarketSnapshot(nse_symbol(ticker))
+    # The four helpers are independent network calls, so run them concurrently
+    results = fan_out({
+        "financial_statements": lambda: get_financial_statements(ticker, snapshot=snapshot),
+        "news": lambda: get_recent_stock_news(ticker),
+        "stock_price_5days": lambda: get_stock_price(ticker, snapshot=snapshot),
+        "stock_info_for_month": lambda: get_stock_info_for_month(ticker, snapshot=snapshot),
+    }, fallbacks={"news": NEWS_UNAVAILABLE})
 
-    return financial_statements, news, stock_price_5days, stock_info_for_month
+    return results["financial_statements"], results["news"], results["stock_price_5days"], results["stock_info_for_month"]
 
 
 
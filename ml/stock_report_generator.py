@@ -1,13 +1,9 @@
 import os
-import pandas as pd
+import hashlib
+import json
 import numpy as np
-import matplotlib.pyplot as plt
-import matplotlib.dates as mdates
-import seaborn as sns
 from datetime import datetime
-import yfinance as yf
 from io import BytesIO
-import matplotlib as mpl
 import re
 from reportlab.lib.pagesizes import letter, landscape
 from reportlab.lib import colors
@@ -16,26 +12,79 @@ from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
 from reportlab.lib.units import inch
 from reportlab.lib.enums import TA_CENTER, TA_LEFT, TA_RIGHT
 
-# Set default theme for all visualizations
-plt.style.use('seaborn-v0_8-pastel')
-sns.set_theme(style="ticks", palette="pastel")
-
-# Configure fonts and colors
-TITLE_FONT_SIZE = 16
-SUBTITLE_FONT_SIZE = 12
-TEXT_FONT_SIZE = 10
-PRIMARY_COLOR = "#2E86C1"  # Blue
-SECONDARY_COLOR = "#F39C12"  # Orange
-ACCENT_COLOR = "#E74C3C"  # Red
-POSITIVE_COLOR = "#2ECC71"  # Green
-NEGATIVE_COLOR = "#E74C3C"  # Red
-NEUTRAL_COLOR = "#7F8C8D"  # Gray
-
 # Import helper functions
 from helper.stock_price_5days import get_stock_price
-from helper.stock_news import get_recent_stock_news
+from helper.stock_news import get_recent_stock_news, NEWS_UNAVAILABLE
 from helper.financial_statements import get_financial_statements
 from helper.stock_info_for_month import get_stock_info_for_month
+from helper.market_snapshot import MarketSnapshot
+from helper.benchmarks import get_benchmark_history, relative_metrics
+from helper.fan_out import fan_out
+from helper.indicators import DEFAULT_PARAMS, compute_indicators, sma
+from helper.indicator_cache import indicator_cache, indicator_key
+from helper import signal_events
+from helper.signal_events import describe_event
+from helper.downsample import crossings, downsample
+from helper.report_charts import CHART_VERSION, plot_width_px, render as render_chart, render_charts
+from helper.report_artifacts import report_store
+from helper import ohlcv_store
+from helper.ttl_cache import IST, is_market_open
+
+# Range of the candlestick chart as a yfinance-style period
+CANDLE_PERIOD = os.getenv("REPORT_CANDLE_PERIOD", "1mo")
+# Longer candle ranges are drawn with weekly bars (about 6 months of sessions)
+MAX_DAILY_CANDLES = 130
+# Range of the long-term history chart (e.g. 5y, 10y or max)
+HISTORY_PERIOD = os.getenv("REPORT_HISTORY_PERIOD", "5y")
+
+# Chart image format: png, png8 (palette PNG), jpeg, svg (vector, needs svglib)
+# or auto. REPORT_SIZE_BUDGET_KB makes auto pick the best output that keeps
+# the PDF within budget.
+IMAGE_FORMAT = os.getenv("REPORT_IMAGE_FORMAT", "auto")
+CHART_DPI = int(os.getenv("REPORT_IMAGE_DPI", "150"))
+SIZE_BUDGET_KB = float(os.getenv("REPORT_SIZE_BUDGET_KB")) if os.getenv("REPORT_SIZE_BUDGET_KB") else None
+# (format, dpi) steps tried in order under a size budget, from best looking to
+# smallest. Palette PNG beats JPEG on size for these flat-colour charts.
+OUTPUT_LADDER = (
+    ('svg', None),
+    ('png', 150),
+    ('png8', 150),
+    ('png8', 110),
+    ('png8', 80),
+)
+
+# Width in inches each chart is placed at in the PDF. Line charts are
+# downsampled to the pixels their plot area gets at that width and CHART_DPI.
+CHART_WIDTH_IN = {
+    'price_trend': 4,
+    'volume_analysis': 4,
+    'financial_metrics': 4,
+    'candlestick': 4,
+    'performance_comparison': 8,
+    'historical_performance': 8,
+    'technical_indicators': 8,
+}
+
+# Part of every stored report's key: bump when the report's content or layout changes
+REPORT_VERSION = 2
+# While NSE is open the day's bar is still forming: stored reports are reused
+# within slots of this many minutes
+INTRADAY_MINUTES = int(os.getenv("REPORT_INTRADAY_MINUTES", "30"))
+
+try:
+    from svglib.svglib import svg2rlg
+except ImportError:
+    svg2rlg = None
+
+
+def _chart_image(image, width, height):
+    """ReportLab flowable for chart image bytes, scaled to width x height points"""
+    if image.lstrip()[:5] in (b'<?xml', b'<svg '):
+        drawing = svg2rlg(BytesIO(image))
+        drawing.scale(width / drawing.width, height / drawing.height)
+        drawing.width, drawing.height = width, height
+        return drawing
+    return Image(BytesIO(image), width=width, height=height)
 
 class StockReport:
     def __init__(self, ticker):
@@ -45,9 +94,20 @@ class StockReport:
         if not self.ticker.endswith('.NS'):
             self.ticker = f"{self.ticker}.NS"
         
-        # Get stock data
-        self.stock = yf.Ticker(self.ticker)
-        self.company_info = self.stock.info
+        # Get stock data (one snapshot shared with all the helpers below)
+        self.snapshot = MarketSnapshot(self.ticker)
+        
+        # Fetch company info, price history and the helper texts concurrently
+        gathered = fan_out({
+            'info': lambda: self.snapshot.info,
+            'history': lambda: self.snapshot.history(),
+            'financial_statements': lambda: get_financial_statements(self.ticker, snapshot=self.snapshot),
+            'news': lambda: get_recent_stock_news(self.ticker),
+            'price_5days': lambda: get_stock_price(self.ticker, snapshot=self.snapshot),
+            'monthly_info': lambda: get_stock_info_for_month(self.ticker, snapshot=self.snapshot),
+        }, fallbacks={'news': NEWS_UNAVAILABLE})
+        
+        self.company_info = gathered['info']
         self.company_name = self.company_info.get('longName', self.company_info.get('shortName', self.ticker))
         
         # Extract and store more company information
@@ -75,19 +135,19 @@ class StockReport:
         self.fifty_two_week_low = self.company_info.get('fiftyTwoWeekLow', 'N/A')
         
         # Get monthly data
-        self.monthly_data = self.stock.history(period="1mo")
+        self.monthly_data = self.snapshot.history("1mo")
         
         # Get 1 year data for trends
-        self.yearly_data = self.stock.history(period="1y")
+        self.yearly_data = self.snapshot.history("1y")
         
-        # Get 5 year data if available for long-term analysis
-        self.five_year_data = self.stock.history(period="5y")
+        # Get long-term data (5 years by default) for long-term analysis
+        self.long_term_data = self.snapshot.history(HISTORY_PERIOD)
         
         # Get financial data using helper functions
-        self.financial_statements_text = get_financial_statements(self.ticker)
-        self.news_text = get_recent_stock_news(self.ticker)
-        self.price_5days_text = get_stock_price(self.ticker)
-        self.monthly_info_text = get_stock_info_for_month(self.ticker)
+        self.financial_statements_text = gathered['financial_statements']
+        self.news_text = gathered['news']
+        self.price_5days_text = gathered['price_5days']
+        self.monthly_info_text = gathered['monthly_info']
         
         # Extract key financial metrics from the text
         self.extract_key_metrics()
@@ -164,535 +224,312 @@ class StockReport:
         
     def calculate_technical_indicators(self):
         """Calculate additional technical indicators for the stock"""
-        self.technical_indicators = {}
+        # Indicators only change with a new bar: reuse the arrays and values computed
+        # by an earlier report on the same data
+        key = indicator_key(self.ticker, self.yearly_data, 'report-1y', DEFAULT_PARAMS)
+        self.indicators, summary = indicator_cache.get_or_compute(key, self._compute_technical_indicators)
+        self.technical_indicators = dict(summary)
         
-        # Calculate 20-day and 50-day moving averages
+        # Crossovers, RSI/Bollinger signals and large monthly moves over the full stored history
+        try:
+            self.signal_events = signal_events.events(self.ticker, refresh=False)
+        except Exception as e:
+            print(f"Could not load signal events: {str(e)}")
+            self.signal_events = []
+        
+        # Determine if golden cross or death cross occurred recently (20-day crossing 50-day)
+        # Look up the latest cross in the past 30 days in the signal event index
         if len(self.yearly_data) >= 50:
-            self.technical_indicators['ma20'] = self.yearly_data['Close'].rolling(window=20).mean().iloc[-1]
-            self.technical_indicators['ma50'] = self.yearly_data['Close'].rolling(window=50).mean().iloc[-1]
-            self.technical_indicators['ma200'] = self.yearly_data['Close'].rolling(window=200).mean().iloc[-1] if len(self.yearly_data) >= 200 else None
-            
-            # Determine if golden cross or death cross occurred recently (20-day crossing 50-day)
-            ma20 = self.yearly_data['Close'].rolling(window=20).mean()
-            ma50 = self.yearly_data['Close'].rolling(window=50).mean()
-            
-            # Check for crosses in the past 30 days
-            last_30 = min(30, len(self.yearly_data))
-            cross_data = pd.DataFrame({'ma20': ma20, 'ma50': ma50}).tail(last_30)
-            
-            # Golden cross: ma20 crosses above ma50
-            golden_cross = (cross_data['ma20'].shift(1) < cross_data['ma50'].shift(1)) & (cross_data['ma20'] > cross_data['ma50'])
-            # Death cross: ma20 crosses below ma50
-            death_cross = (cross_data['ma20'].shift(1) > cross_data['ma50'].shift(1)) & (cross_data['ma20'] < cross_data['ma50'])
+            since = self.yearly_data.index[-30].strftime('%Y-%m-%d')
+            crosses = [e for e in self.signal_events
+                       if e['type'] in ('golden_cross', 'death_cross') and e['date'] >= since]
             
-            if golden_cross.any():
-                self.technical_indicators['recent_golden_cross'] = True
-                self.technical_indicators['cross_date'] = cross_data[golden_cross].index[0].strftime('%Y-%m-%d')
-            elif death_cross.any():
-                self.technical_indicators['recent_death_cross'] = True
-                self.technical_indicators['cross_date'] = cross_data[death_cross].index[0].strftime('%Y-%m-%d')
-        
-        # Calculate RSI (Relative Strength Index)
+            if crosses:
+                self.technical_indicators[f"recent_{crosses[-1]['type']}"] = True
+                self.technical_indicators['cross_date'] = crosses[-1]['date']
+        
+        # Beta, alpha and relative strength against the shared NIFTY 50 series
         try:
-            delta = self.yearly_data['Close'].diff()
-            gain = delta.where(delta > 0, 0).rolling(window=14).mean()
-            loss = -delta.where(delta < 0, 0).rolling(window=14).mean()
-            rs = gain / loss
-            rsi = 100 - (100 / (1 + rs)).iloc[-1]
-            self.technical_indicators['rsi'] = rsi
+            nifty = get_benchmark_history("NIFTY 50", "1y")
+            self.benchmark_metrics = relative_metrics(self.yearly_data['Close'], nifty['Close'])
+        except Exception as e:
+            print(f"Could not compute benchmark metrics: {str(e)}")
+            self.benchmark_metrics = {}
+        
+    def _compute_technical_indicators(self):
+        """Indicator arrays over the past year and the latest values summarised from them"""
+        technical_indicators = {}
+        
+        # Compute every indicator series once over the year; charts slice these arrays
+        close = self.yearly_data['Close'].to_numpy(dtype=float)
+        ind = compute_indicators(close, self.yearly_data['Volume'].to_numpy(dtype=float))
+        
+        # Calculate 20-day and 50-day moving averages
+        if len(close) >= 50:
+            technical_indicators['ma20'] = ind['ma20'][-1]
+            technical_indicators['ma50'] = ind['ma50'][-1]
+            technical_indicators['ma200'] = ind['ma200'][-1] if len(close) >= 200 else None
+        
+        # RSI (Relative Strength Index)
+        try:
+            technical_indicators['rsi'] = ind['rsi'][-1]
         except:
-            self.technical_indicators['rsi'] = None
+            technical_indicators['rsi'] = None
             
-        # Calculate MACD (Moving Average Convergence Divergence)
+        # MACD (Moving Average Convergence Divergence)
         try:
-            exp1 = self.yearly_data['Close'].ewm(span=12, adjust=False).mean()
-            exp2 = self.yearly_data['Close'].ewm(span=26, adjust=False).mean()
-            macd = exp1 - exp2
-            signal = macd.ewm(span=9, adjust=False).mean()
+            macd, signal = ind['macd'][-1], ind['macd_signal'][-1]
             
-            self.technical_indicators['macd'] = macd.iloc[-1]
-            self.technical_indicators['macd_signal'] = signal.iloc[-1]
-            self.technical_indicators['macd_histogram'] = macd.iloc[-1] - signal.iloc[-1]
-            self.technical_indicators['macd_trend'] = 'bullish' if macd.iloc[-1] > signal.iloc[-1] else 'bearish'
+            technical_indicators['macd'] = macd
+            technical_indicators['macd_signal'] = signal
+            technical_indicators['macd_histogram'] = ind['macd_hist'][-1]
+            technical_indicators['macd_trend'] = 'bullish' if macd > signal else 'bearish'
         except:
-            self.technical_indicators['macd'] = None
+            technical_indicators['macd'] = None
             
-        # Calculate Bollinger Bands
+        # Bollinger Bands
         try:
-            window = 20
-            std_dev = 2
-            
-            sma = self.yearly_data['Close'].rolling(window=window).mean()
-            rolling_std = self.yearly_data['Close'].rolling(window=window).std()
+            upper_band, lower_band = ind['bb_upper'][-1], ind['bb_lower'][-1]
             
-            upper_band = sma + (rolling_std * std_dev)
-            lower_band = sma - (rolling_std * std_dev)
-            
-            self.technical_indicators['bollinger_sma'] = sma.iloc[-1]
-            self.technical_indicators['bollinger_upper'] = upper_band.iloc[-1]
-            self.technical_indicators['bollinger_lower'] = lower_band.iloc[-1]
+            technical_indicators['bollinger_sma'] = ind['bb_mid'][-1]
+            technical_indicators['bollinger_upper'] = upper_band
+            technical_indicators['bollinger_lower'] = lower_band
             
             # Check if price is near bands
-            current_price = self.yearly_data['Close'].iloc[-1]
-            band_width = upper_band.iloc[-1] - lower_band.iloc[-1]
+            current_price = close[-1]
+            band_width = upper_band - lower_band
             
-            if current_price > (upper_band.iloc[-1] - 0.05 * band_width):
-                self.technical_indicators['bollinger_position'] = 'near upper band (potential overbought)'
-            elif current_price < (lower_band.iloc[-1] + 0.05 * band_width):
-                self.technical_indicators['bollinger_position'] = 'near lower band (potential oversold)'
+            if current_price > (upper_band - 0.05 * band_width):
+                technical_indicators['bollinger_position'] = 'near upper band (potential overbought)'
+            elif current_price < (lower_band + 0.05 * band_width):
+                technical_indicators['bollinger_position'] = 'near lower band (potential oversold)'
             else:
-                self.technical_indicators['bollinger_position'] = 'middle range'
+                technical_indicators['bollinger_position'] = 'middle range'
         except:
-            self.technical_indicators['bollinger_sma'] = None
+            technical_indicators['bollinger_sma'] = None
+            
+        return ind, technical_indicators
+        
+    def _chart_dates(self, index):
+        """Index as naive local datetime64 values for plotting"""
+        if index.tz is not None:
+            index = index.tz_localize(None)
+        return index.values
+        
+    def _price_trend_payload(self):
+        dates = self._chart_dates(self.yearly_data.index)
+        close = self.yearly_data['Close'].to_numpy(dtype=float)
+        ma50, ma200 = self.indicators['ma50'], self.indicators['ma200']
+        
+        # No more points than the plot is pixels wide, keeping the high and the MA crossovers
+        keep = np.concatenate([[np.argmax(close), np.argmin(close)], crossings(close, ma50), crossings(close, ma200)])
+        rows = downsample(dates, close, plot_width_px(dpi=CHART_DPI, width_in=CHART_WIDTH_IN['price_trend']), keep)
+        return {
+            'company_name': self.company_name,
+            'dates': dates[rows],
+            'close': close[rows],
+            'ma50': ma50[rows],
+            'ma200': ma200[rows] if len(self.yearly_data) >= 200 else None,
+        }
+        
+    def _volume_analysis_payload(self):
+        return {
+            'company_name': self.company_name,
+            'dates': self._chart_dates(self.yearly_data.index),
+            'up': (self.yearly_data['Close'] >= self.yearly_data['Open']).to_numpy(),
+            'volume': self.yearly_data['Volume'].to_numpy(dtype=float),
+            'vol_ma20': self.indicators['vol_ma20'],
+        }
+        
+    def _financial_metrics_payload(self):
+        # Extract key metrics if available
+        labels = {
+            'total_assets': 'Total Assets',
+            'total_liabilities': 'Total Liabilities',
+            'revenue': 'Revenue',
+            'net_income': 'Net Income',
+        }
+        return {
+            'company_name': self.company_name,
+            'metrics': {label: self.metrics[key] for key, label in labels.items() if key in self.metrics},
+        }
+        
+    def _candlestick_payload(self):
+        # Last month by default (REPORT_CANDLE_PERIOD widens it, e.g. 6mo or 1y)
+        if CANDLE_PERIOD == '1mo':
+            data, range_label = self.monthly_data.tail(30), '30-Day'
+        else:
+            data, range_label = self.snapshot.history(CANDLE_PERIOD), CANDLE_PERIOD
+            if len(data) > MAX_DAILY_CANDLES:
+                # Too many sessions for readable daily candles: weekly bars from the stored days
+                data, range_label = self.snapshot.history(CANDLE_PERIOD, interval="1wk"), f"{CANDLE_PERIOD} Weekly"
+        return {
+            'company_name': self.company_name,
+            'range_label': range_label,
+            'dates': self._chart_dates(data.index),
+            **{column.lower(): data[column].to_numpy(dtype=float) for column in ('Open', 'High', 'Low', 'Close')},
+        }
+        
+    def _performance_comparison_payload(self):
+        payload = {'company_name': self.company_name}
+        try:
+            nifty = get_benchmark_history("NIFTY 50", "1y")
+            
+            # Normalize both series to 100 at the start for comparison
+            stock_close = self.yearly_data['Close'].to_numpy(dtype=float)
+            nifty_close = nifty['Close'].to_numpy(dtype=float)
+            payload.update({
+                'dates': self._chart_dates(self.yearly_data.index),
+                'stock_norm': stock_close / stock_close[0] * 100,
+                'benchmark_dates': self._chart_dates(nifty.index),
+                'benchmark_norm': nifty_close / nifty_close[0] * 100,
+            })
+        except Exception as e:
+            payload['error'] = str(e)
+        return payload
+        
+    def _historical_performance_payload(self):
+        data = self.long_term_data
+        # Approximately 1 year of trading days
+        payload = {'company_name': self.company_name, 'enough_history': len(data) >= 252}
+        if not payload['enough_history']:
+            return payload
+        
+        # 200-day average warmed up on the full stored history
+        full_close = self.snapshot.history("max")['Close'].to_numpy(dtype=float)
+        close = data['Close'].to_numpy(dtype=float)
+        ma200 = sma(full_close, 200)[len(full_close) - len(close):]
+        dates = self._chart_dates(data.index)
+        ath = int(np.argmax(close))
+        
+        # Significant price changes (>10% in a month) come from the signal event index
+        since = data.index[0].strftime('%Y-%m-%d')
+        moves = [e for e in self.signal_events if e['type'] == 'monthly_move' and e['date'] >= since]
+        move_dates = np.array([e['date'] for e in moves], dtype='datetime64[ns]')
+        
+        # Reduce years of daily closes to the plot's pixel width, keeping the ATH,
+        # the monthly move markers and the 200-day MA crossovers on the line
+        move_rows = np.searchsorted(dates, move_dates)
+        width = plot_width_px(dpi=CHART_DPI, width_in=CHART_WIDTH_IN['historical_performance'])
+        rows = downsample(dates, close, width, np.concatenate([[ath], move_rows, crossings(close, ma200)]))
+        payload.update({
+            'dates': dates[rows],
+            'close': close[rows],
+            'ma200': ma200[rows],
+            'move_dates': move_dates,
+            'move_closes': np.array([e['close'] for e in moves], dtype=float),
+            'move_up': np.array([e['value'] > 0 for e in moves], dtype=bool),
+            'ath': close[ath],
+            'ath_date': dates[ath],
+            'current_price': close[-1],
+            'current_date': dates[-1],
+            'years': None,
+            'cagr': None,
+        })
+        
+        # Calculate CAGR
+        if len(data) >= 252 * 3:  # At least 3 years of data
+            years = (data.index[-1] - data.index[0]).days / 365.25
+            payload['years'] = years
+            payload['cagr'] = ((close[-1] / close[0]) ** (1 / years) - 1) * 100
+        return payload
+        
+    def _technical_indicators_payload(self):
+        # Last 6 months, with indicators warmed up on the full year of data
+        data = self.yearly_data.tail(130)
+        payload = {name: self.indicators[name][-len(data):]
+                   for name in ('bb_mid', 'bb_upper', 'bb_lower', 'macd', 'macd_signal', 'macd_hist', 'rsi')}
+        payload.update({
+            'company_name': self.company_name,
+            'dates': self._chart_dates(data.index),
+            'close': data['Close'].to_numpy(dtype=float),
+        })
+        return payload
+        
+    def chart_payloads(self):
+        """Array payloads for every report chart, as {name: (kind, payload)} for render_charts"""
+        return {
+            name: (name, getattr(self, f'_{name}_payload')())
+            for name in ('price_trend', 'volume_analysis', 'financial_metrics', 'candlestick',
+                         'performance_comparison', 'historical_performance', 'technical_indicators')
+        }
+        
+    def _plot(self, name):
+        return BytesIO(render_chart(name, getattr(self, f'_{name}_payload')()))
         
     def plot_price_trend(self):
         """Plot price trend over the past year"""
-        plt.figure(figsize=(10, 6))
-        plt.plot(self.yearly_data.index, self.yearly_data['Close'], color=PRIMARY_COLOR, linewidth=2)
-        
-        # Add 50-day moving average
-        ma50 = self.yearly_data['Close'].rolling(window=50).mean()
-        plt.plot(self.yearly_data.index, ma50, color=SECONDARY_COLOR, linewidth=1.5, linestyle='--', label='50-day MA')
-        
-        # Add 200-day moving average if enough data
-        if len(self.yearly_data) >= 200:
-            ma200 = self.yearly_data['Close'].rolling(window=200).mean()
-            plt.plot(self.yearly_data.index, ma200, color=ACCENT_COLOR, linewidth=1.5, linestyle='-.', label='200-day MA')
-        
-        # Format axes
-        plt.title(f"{self.company_name} - 1 Year Price Trend", fontsize=TITLE_FONT_SIZE, fontweight='bold')
-        plt.xlabel('Date', fontsize=TEXT_FONT_SIZE)
-        plt.ylabel('Price (₹)', fontsize=TEXT_FONT_SIZE)
-        plt.grid(True, alpha=0.3)
-        plt.legend()
-        
-        # Format date ticks
-        plt.gca().xaxis.set_major_locator(mdates.MonthLocator(interval=1))
-        plt.gca().xaxis.set_major_formatter(mdates.DateFormatter('%b %Y'))
-        plt.xticks(rotation=45)
-        
-        # Tight layout to use space efficiently
-        plt.tight_layout()
-        
-        # Save to BytesIO object
-        img_data = BytesIO()
-        plt.savefig(img_data, format='png', dpi=150)
-        img_data.seek(0)
-        plt.close()
-        
-        return img_data
+        return self._plot('price_trend')
         
     def plot_volume_analysis(self):
         """Plot volume trend over the past year"""
-        plt.figure(figsize=(10, 6))
-        
-        # Create a colormap based on price changes
-        colors = [POSITIVE_COLOR if close >= open_price else NEGATIVE_COLOR 
-                 for close, open_price in zip(self.yearly_data['Close'], self.yearly_data['Open'])]
-        
-        # Plot volume bars
-        plt.bar(self.yearly_data.index, self.yearly_data['Volume'], color=colors, alpha=0.7)
-        
-        # Add 20-day moving average of volume
-        vol_ma20 = self.yearly_data['Volume'].rolling(window=20).mean()
-        plt.plot(self.yearly_data.index, vol_ma20, color=PRIMARY_COLOR, linewidth=2, linestyle='-', label='20-day Volume MA')
+        return self._plot('volume_analysis')
         
-        # Format axes
-        plt.title(f"{self.company_name} - Trading Volume Analysis", fontsize=TITLE_FONT_SIZE, fontweight='bold')
-        plt.xlabel('Date', fontsize=TEXT_FONT_SIZE)
-        plt.ylabel('Volume', fontsize=TEXT_FONT_SIZE)
-        plt.grid(True, alpha=0.3)
-        plt.legend()
-        
-        # Format date ticks
-        plt.gca().xaxis.set_major_locator(mdates.MonthLocator(interval=1))
-        plt.gca().xaxis.set_major_formatter(mdates.DateFormatter('%b %Y'))
-        plt.xticks(rotation=45)
-        
-        # Format y-axis with millions/billions
-        plt.gca().yaxis.set_major_formatter(mpl.ticker.FuncFormatter(lambda x, p: f'{x/1000000:.1f}M' if x < 1e9 else f'{x/1000000000:.1f}B'))
-        
-        # Tight layout to use space efficiently
-        plt.tight_layout()
-        
-        # Save to BytesIO object
-        img_data = BytesIO()
-        plt.savefig(img_data, format='png', dpi=150)
-        img_data.seek(0)
-        plt.close()
-        
-        return img_data
-    
     def plot_financial_metrics(self):
         """Plot key financial metrics as a bar chart"""
-        plt.figure(figsize=(10, 6))
-        
-        # Extract key metrics if available
-        metrics_to_plot = {}
-        if 'total_assets' in self.metrics:
-            metrics_to_plot['Total Assets'] = self.metrics['total_assets']
-        if 'total_liabilities' in self.metrics:
-            metrics_to_plot['Total Liabilities'] = self.metrics['total_liabilities']
-        if 'revenue' in self.metrics:
-            metrics_to_plot['Revenue'] = self.metrics['revenue']
-        if 'net_income' in self.metrics:
-            metrics_to_plot['Net Income'] = self.metrics['net_income']
-            
-        if not metrics_to_plot:
-            # If no metrics available, create a placeholder
-            plt.text(0.5, 0.5, "Financial metrics data not available", 
-                    ha='center', va='center', fontsize=12, transform=plt.gca().transAxes)
-        else:
-            # Plot bar chart
-            x = list(metrics_to_plot.keys())
-            y = list(metrics_to_plot.values())
-            
-            bars = plt.bar(x, y, color=[PRIMARY_COLOR, ACCENT_COLOR, SECONDARY_COLOR, POSITIVE_COLOR])
-            
-            # Add labels
-            plt.title(f"{self.company_name} - Key Financial Metrics (₹ Crores)", fontsize=TITLE_FONT_SIZE, fontweight='bold')
-            plt.ylabel('₹ Crores', fontsize=TEXT_FONT_SIZE)
-            
-            # Add data labels on top of bars
-            for bar in bars:
-                height = bar.get_height()
-                plt.text(bar.get_x() + bar.get_width()/2., height + 0.1,
-                        f'₹{height:.1f} Cr', ha='center', va='bottom', rotation=0, fontsize=9)
-            
-            plt.grid(True, alpha=0.3, axis='y')
-        
-        # Tight layout to use space efficiently
-        plt.tight_layout()
-        
-        # Save to BytesIO object
-        img_data = BytesIO()
-        plt.savefig(img_data, format='png', dpi=150)
-        img_data.seek(0)
-        plt.close()
-        
-        return img_data
+        return self._plot('financial_metrics')
         
     def plot_candlestick_chart(self):
         """Create a candlestick chart for the last month"""
-        # Use the last 30 days of data
-        data = self.monthly_data.tail(30).copy()
-        
-        # Create figure and axis
-        fig, ax = plt.subplots(figsize=(10, 6))
-        
-        # Format dates on x-axis
-        dates = [date.date() for date in data.index]
-        
-        # Determine colors for candlesticks
-        colors = [POSITIVE_COLOR if close >= open_price else NEGATIVE_COLOR 
-                 for close, open_price in zip(data['Close'], data['Open'])]
-        
-        # Plot candlestick wicks (high-low range)
-        for i, (idx, row) in enumerate(data.iterrows()):
-            # Plot the high-low line
-            ax.plot([i, i], [row['Low'], row['High']], color='black', linewidth=1)
-        
-        # Plot candlestick bodies (open-close range)
-        for i, (idx, row) in enumerate(data.iterrows()):
-            open_price = row['Open']
-            close = row['Close']
-            
-            # Determine if it's an up or down day
-            if close >= open_price:
-                color = POSITIVE_COLOR
-                bottom = open_price
-                height = close - open_price
-            else:
-                color = NEGATIVE_COLOR
-                bottom = close
-                height = open_price - close
-                
-            # Plot the body
-            ax.bar(i, height, bottom=bottom, color=color, width=0.8, alpha=0.7)
-        
-        # Set x-axis labels
-        plt.xticks(range(len(dates)), [date.strftime('%d-%b') for date in dates], rotation=45)
-        plt.xlim(-1, len(dates))
-        
-        # Set chart title and labels
-        plt.title(f"{self.company_name} - 30-Day Price Action", fontsize=TITLE_FONT_SIZE, fontweight='bold')
-        plt.xlabel('Date', fontsize=TEXT_FONT_SIZE)
-        plt.ylabel('Price (₹)', fontsize=TEXT_FONT_SIZE)
-        plt.grid(True, alpha=0.3, axis='y')
-        
-        # Tight layout to use space efficiently
-        plt.tight_layout()
-        
-        # Save to BytesIO object
-        img_data = BytesIO()
-        plt.savefig(img_data, format='png', dpi=150)
-        img_data.seek(0)
-        plt.close()
-        
-        return img_data
+        return self._plot('candlestick')
     
     def plot_performance_comparison(self):
         """Compare stock performance with NIFTY 50 index over past year"""
-        plt.figure(figsize=(10, 6))
-        
-        # Get NIFTY 50 data
-        try:
-            nifty = yf.Ticker("^NSEI").history(period="1y")
-            
-            # Normalize both series to 100 at the start for comparison
-            stock_norm = self.yearly_data['Close'] / self.yearly_data['Close'].iloc[0] * 100
-            nifty_norm = nifty['Close'] / nifty['Close'].iloc[0] * 100
-            
-            # Plot both series
-            plt.plot(self.yearly_data.index, stock_norm, color=PRIMARY_COLOR, linewidth=2, label=f"{self.company_name}")
-            plt.plot(nifty.index, nifty_norm, color=SECONDARY_COLOR, linewidth=2, linestyle='--', label="NIFTY 50")
-            
-            # Calculate outperformance
-            outperformance = stock_norm.iloc[-1] - nifty_norm.iloc[-1]
-            
-            # Format axes
-            performance_text = f"Outperformed by {outperformance:.2f}%" if outperformance > 0 else f"Underperformed by {-outperformance:.2f}%"
-            plt.title(f"{self.company_name} vs NIFTY 50 - Relative Performance\n{performance_text}", 
-                    fontsize=TITLE_FONT_SIZE, fontweight='bold')
-            
-        except Exception as e:
-            plt.text(0.5, 0.5, f"Could not load comparison data: {str(e)}", 
-                   ha='center', va='center', fontsize=12, transform=plt.gca().transAxes)
-        
-        plt.xlabel('Date', fontsize=TEXT_FONT_SIZE)
-        plt.ylabel('Normalized Price (Starting at 100)', fontsize=TEXT_FONT_SIZE)
-        plt.grid(True, alpha=0.3)
-        plt.legend()
-        
-        # Format date ticks
-        plt.gca().xaxis.set_major_locator(mdates.MonthLocator(interval=1))
-        plt.gca().xaxis.set_major_formatter(mdates.DateFormatter('%b %Y'))
-        plt.xticks(rotation=45)
-        
-        # Tight layout to use space efficiently
-        plt.tight_layout()
-        
-        # Save to BytesIO object
-        img_data = BytesIO()
-        plt.savefig(img_data, format='png', dpi=150)
-        img_data.seek(0)
-        plt.close()
-        
-        return img_data
+        return self._plot('performance_comparison')
         
     def plot_historical_performance(self):
         """Plot historical performance over 5 years if available"""
-        plt.figure(figsize=(10, 6))
-        
-        # Check if we have enough data
-        if len(self.five_year_data) < 252:  # Approximately 1 year of trading days
-            plt.text(0.5, 0.5, "Insufficient historical data available (less than 1 year)", 
-                   ha='center', va='center', fontsize=12, transform=plt.gca().transAxes)
-        else:
-            # Plot the close price
-            plt.plot(self.five_year_data.index, self.five_year_data['Close'], color=PRIMARY_COLOR, linewidth=1.5)
-            
-            # Add a 200-day moving average
-            ma200 = self.five_year_data['Close'].rolling(window=200).mean()
-            plt.plot(self.five_year_data.index, ma200, color=SECONDARY_COLOR, linewidth=1.5, linestyle='--', label='200-day MA')
-            
-            # Highlight key events and significant price movements
-            # Find significant price changes (e.g., >10% in a month)
-            monthly_returns = self.five_year_data['Close'].resample('M').last().pct_change() * 100
-            significant_months = monthly_returns[abs(monthly_returns) > 10].index
-            
-            # Highlight these periods
-            for month in significant_months:
-                # Find the data point in our original dataframe
-                try:
-                    month_data = self.five_year_data.loc[month.strftime('%Y-%m')]
-                    if not month_data.empty:
-                        # Get the last trading day of the month
-                        last_day = month_data.iloc[-1]
-                        plt.plot(last_day.name, last_day['Close'], 'o', 
-                                 color=POSITIVE_COLOR if monthly_returns.loc[month] > 0 else NEGATIVE_COLOR,
-                                 markersize=6)
-                except:
-                    pass  # Skip if month is not found
-            
-            # Add annotations for current price and all-time high
-            all_time_high = self.five_year_data['Close'].max()
-            all_time_high_date = self.five_year_data['Close'].idxmax()
-            
-            current_price = self.five_year_data['Close'].iloc[-1]
-            current_date = self.five_year_data.index[-1]
-            
-            # Calculate percent from all-time high
-            pct_from_ath = ((current_price - all_time_high) / all_time_high) * 100
-            
-            plt.annotate(f'ATH: ₹{all_time_high:.2f}', 
-                         xy=(all_time_high_date, all_time_high),
-                         xytext=(10, 20),
-                         textcoords='offset points',
-                         arrowprops=dict(arrowstyle='->', color='black', lw=1),
-                         fontsize=9)
-            
-            if current_date != all_time_high_date:  # Don't annotate if current price is ATH
-                plt.annotate(f'Current: ₹{current_price:.2f}\n({pct_from_ath:.1f}% from ATH)', 
-                             xy=(current_date, current_price),
-                             xytext=(10, -30),
-                             textcoords='offset points',
-                             arrowprops=dict(arrowstyle='->', color='black', lw=1),
-                             fontsize=9)
-            
-            # Calculate and display CAGR
-            if len(self.five_year_data) >= 252 * 3:  # At least 3 years of data
-                years = (self.five_year_data.index[-1] - self.five_year_data.index[0]).days / 365.25
-                start_price = self.five_year_data['Close'].iloc[0]
-                end_price = self.five_year_data['Close'].iloc[-1]
-                cagr = ((end_price / start_price) ** (1 / years) - 1) * 100
-                
-                plt.title(f"{self.company_name} - {years:.1f}-Year Price History\nCAGR: {cagr:.2f}%", 
-                          fontsize=TITLE_FONT_SIZE, fontweight='bold')
-            else:
-                plt.title(f"{self.company_name} - Long-term Price History", 
-                          fontsize=TITLE_FONT_SIZE, fontweight='bold')
-        
-        plt.xlabel('Date', fontsize=TEXT_FONT_SIZE)
-        plt.ylabel('Price (₹)', fontsize=TEXT_FONT_SIZE)
-        plt.grid(True, alpha=0.3)
-        plt.legend()
-        
-        # Format date ticks
-        plt.gca().xaxis.set_major_locator(mdates.YearLocator())
-        plt.gca().xaxis.set_major_formatter(mdates.DateFormatter('%Y'))
-        plt.xticks(rotation=45)
-        
-        # Tight layout to use space efficiently
-        plt.tight_layout()
-        
-        # Save to BytesIO object
-        img_data = BytesIO()
-        plt.savefig(img_data, format='png', dpi=150)
-        img_data.seek(0)
-        plt.close()
-        
-        return img_data
+        return self._plot('historical_performance')
         
     def plot_technical_indicators(self):
         """Plot technical indicators (RSI, MACD, Bollinger Bands)"""
-        # Create a figure with 3 subplots
-        fig, (ax1, ax2, ax3) = plt.subplots(3, 1, figsize=(10, 12), gridspec_kw={'height_ratios': [2, 1, 1]})
-        
-        # Get data for the last 6 months
-        data = self.yearly_data.tail(130).copy()
-        
-        # Plot 1: Price and Bollinger Bands
-        ax1.plot(data.index, data['Close'], color=PRIMARY_COLOR, label='Close Price')
-        
-        # Calculate Bollinger Bands
-        window = 20
-        std_dev = 2
-        
-        rolling_mean = data['Close'].rolling(window=window).mean()
-        rolling_std = data['Close'].rolling(window=window).std()
-        
-        upper_band = rolling_mean + (rolling_std * std_dev)
-        lower_band = rolling_mean - (rolling_std * std_dev)
-        
-        ax1.plot(data.index, rolling_mean, color=NEUTRAL_COLOR, label='20-day SMA')
-        ax1.plot(data.index, upper_band, color=SECONDARY_COLOR, linestyle='--', label='Upper Band')
-        ax1.plot(data.index, lower_band, color=SECONDARY_COLOR, linestyle='--', label='Lower Band')
-        ax1.fill_between(data.index, upper_band, lower_band, color=SECONDARY_COLOR, alpha=0.1)
-        
-        ax1.set_title(f"{self.company_name} - Technical Analysis", fontsize=TITLE_FONT_SIZE, fontweight='bold')
-        ax1.set_ylabel('Price (₹)', fontsize=TEXT_FONT_SIZE)
-        ax1.grid(True, alpha=0.3)
-        ax1.legend(loc='upper left')
-        
-        # Plot 2: MACD
-        # Calculate MACD
-        exp1 = data['Close'].ewm(span=12, adjust=False).mean()
-        exp2 = data['Close'].ewm(span=26, adjust=False).mean()
-        macd = exp1 - exp2
-        signal = macd.ewm(span=9, adjust=False).mean()
-        histogram = macd - signal
-        
-        ax2.plot(data.index, macd, color=PRIMARY_COLOR, label='MACD')
-        ax2.plot(data.index, signal, color=SECONDARY_COLOR, label='Signal')
-        
-        # Plot histogram with colors
-        for i in range(len(histogram)):
-            if i > 0:
-                if histogram.iloc[i] >= 0 and histogram.iloc[i-1] < 0:
-                    ax2.axvline(histogram.index[i], color=NEUTRAL_COLOR, linestyle='--', alpha=0.3)
-                elif histogram.iloc[i] < 0 and histogram.iloc[i-1] >= 0:
-                    ax2.axvline(histogram.index[i], color=NEUTRAL_COLOR, linestyle='--', alpha=0.3)
-                    
-        # Plot positive and negative histogram values with different colors
-        pos_hist = histogram.copy()
-        neg_hist = histogram.copy()
-        pos_hist[pos_hist < 0] = 0
-        neg_hist[neg_hist > 0] = 0
-        
-        ax2.bar(data.index, pos_hist, color=POSITIVE_COLOR, label='Positive MACD', width=1.5, alpha=0.7)
-        ax2.bar(data.index, neg_hist, color=NEGATIVE_COLOR, label='Negative MACD', width=1.5, alpha=0.7)
-        
-        ax2.set_ylabel('MACD', fontsize=TEXT_FONT_SIZE)
-        ax2.grid(True, alpha=0.3)
-        ax2.axhline(y=0, color='black', linestyle='-', alpha=0.3)
-        ax2.legend(loc='upper left')
-        
-        # Plot 3: RSI
-        # Calculate RSI
-        delta = data['Close'].diff()
-        gain = delta.where(delta > 0, 0)
-        loss = -delta.where(delta < 0, 0)
-        
-        avg_gain = gain.rolling(window=14).mean()
-        avg_loss = loss.rolling(window=14).mean()
-        
-        rs = avg_gain / avg_loss
-        rsi = 100 - (100 / (1 + rs))
-        
-        ax3.plot(data.index, rsi, color=ACCENT_COLOR, label='RSI')
+        return self._plot('technical_indicators')
         
-        # Add overbought/oversold levels
-        ax3.axhline(y=70, color=NEGATIVE_COLOR, linestyle='--', alpha=0.5, label='Overbought (70)')
-        ax3.axhline(y=30, color=POSITIVE_COLOR, linestyle='--', alpha=0.5, label='Oversold (30)')
-        ax3.axhline(y=50, color=NEUTRAL_COLOR, linestyle='-', alpha=0.3)
-        
-        # Fill overbought/oversold regions
-        ax3.fill_between(data.index, 70, 100, color=NEGATIVE_COLOR, alpha=0.1)
-        ax3.fill_between(data.index, 0, 30, color=POSITIVE_COLOR, alpha=0.1)
-        
-        ax3.set_ylabel('RSI', fontsize=TEXT_FONT_SIZE)
-        ax3.set_ylim(0, 100)
-        ax3.grid(True, alpha=0.3)
-        ax3.legend(loc='upper left')
-        
-        # Set common x-axis label and format
-        fig.text(0.5, 0.04, 'Date', ha='center', fontsize=TEXT_FONT_SIZE)
-        
-        # Format date ticks
-        for ax in [ax1, ax2, ax3]:
-            ax.xaxis.set_major_locator(mdates.MonthLocator())
-            ax.xaxis.set_major_formatter(mdates.DateFormatter('%b %Y'))
-            plt.setp(ax.xaxis.get_majorticklabels(), rotation=45)
-        
-        # Tight layout to use space efficiently
-        plt.tight_layout()
-        plt.subplots_adjust(bottom=0.1)
-        
-        # Save to BytesIO object
-        img_data = BytesIO()
-        plt.savefig(img_data, format='png', dpi=150)
-        img_data.seek(0)
-        plt.close()
-        
-        return img_data
+    @property
+    def report_filename(self):
+        return f"{self.ticker.replace('.NS', '')}_stock_report.pdf"
         
     def generate_pdf_report(self):
         """Generate a comprehensive PDF report with all visualizations and data using ReportLab"""
-        report_filename = f"{self.ticker.replace('.NS', '')}_stock_report.pdf"
+        report_filename = self.report_filename
+        with open(report_filename, 'wb') as f:
+            f.write(self.build_pdf())
+        return report_filename
+        
+    def build_pdf(self, image_format=IMAGE_FORMAT, size_budget_kb=SIZE_BUDGET_KB):
+        """
+        PDF report bytes. With image_format 'auto' and a size budget, charts are
+        re-encoded down OUTPUT_LADDER until the whole PDF fits the budget (the
+        smallest attempt is used if none does); without a budget 'auto' means png8.
+        """
+        payloads = self.chart_payloads()
+        if image_format == 'svg' and svg2rlg is None:
+            print("svglib is not installed, using palette PNG charts instead of SVG")
+            image_format = 'png8'
+        if image_format != 'auto':
+            steps = [(image_format, CHART_DPI)]
+        elif size_budget_kb is None:
+            steps = [('png8', CHART_DPI)]
+        else:
+            steps = [(fmt, dpi) for fmt, dpi in OUTPUT_LADDER if fmt != 'svg' or svg2rlg is not None]
+        
+        smallest = None
+        for image_format, dpi in steps:
+            # Render all seven charts concurrently in the chart worker pool
+            pdf = self._build_pdf(render_charts(payloads, image_format, dpi))
+            if size_budget_kb is None or len(pdf) <= size_budget_kb * 1024:
+                return pdf
+            if smallest is None or len(pdf) < len(smallest):
+                smallest = pdf
+        print(f"{self.ticker} report exceeds the {size_budget_kb:g} KB size budget ({len(smallest) / 1024:.0f} KB)")
+        return smallest
+        
+    def _build_pdf(self, charts):
+        """Lay out the report around already rendered chart images and return the PDF bytes"""
+        output = BytesIO()
         
         # Create PDF document
-        doc = SimpleDocTemplate(report_filename, pagesize=landscape(letter))
+        doc = SimpleDocTemplate(output, pagesize=landscape(letter))
         styles = getSampleStyleSheet()
         
         # Create custom styles
@@ -884,6 +721,14 @@ class StockReport:
                  "Bollinger Position", f"{ti.get('bollinger_position', 'N/A')}" if ti.get('bollinger_position') else 'N/A']
             ]
             
+            # Add benchmark-relative metrics if available
+            bm = getattr(self, 'benchmark_metrics', {})
+            if bm:
+                tech_data.append(["Beta (vs NIFTY 50)", f"{bm['beta']:.2f}",
+                                  "Alpha (annualised)", f"{bm['alpha']:.2f}%"])
+                tech_data.append(["Correlation (vs NIFTY 50)", f"{bm['correlation']:.2f}",
+                                  "Relative Strength (1Y)", f"{bm['relative_strength']:.2f}"])
+            
             # Add special note if golden/death cross detected
             if ti.get('recent_golden_cross'):
                 tech_data.append(["Moving Average Cross", f"Golden Cross detected on {ti.get('cross_date')}", "", ""])
@@ -894,16 +739,21 @@ class StockReport:
             tech_table = Table(tech_data, colWidths=[2*inch, 2*inch, 2*inch, 2*inch])
             tech_table.setStyle(table_style)  # Reuse the same style
             elements.append(tech_table)
+            
+            # Most recent signals from the event index
+            recent_signals = getattr(self, 'signal_events', [])[-5:][::-1]
+            if recent_signals:
+                elements.append(Spacer(1, 0.1*inch))
+                elements.append(Paragraph("Recent Signals", subheading_style))
+                for event in recent_signals:
+                    elements.append(Paragraph(f"• {describe_event(event)}", small_style))
         
         elements.append(Spacer(1, 0.2*inch))
         
         # Charts Section - First set
         elements.append(Paragraph("Price and Volume Analysis", heading_style))
-        price_trend_img = self.plot_price_trend()
-        volume_img = self.plot_volume_analysis()
-        
-        img1 = Image(price_trend_img, width=4*inch, height=2.4*inch)
-        img2 = Image(volume_img, width=4*inch, height=2.4*inch)
+        img1 = _chart_image(charts['price_trend'], width=CHART_WIDTH_IN['price_trend']*inch, height=2.4*inch)
+        img2 = _chart_image(charts['volume_analysis'], width=CHART_WIDTH_IN['volume_analysis']*inch, height=2.4*inch)
         chart_table1 = Table([[img1, img2]], colWidths=[4.2*inch, 4.2*inch])
         chart_table1.setStyle(TableStyle([
             ('ALIGN', (0, 0), (1, 0), 'CENTER'),
@@ -914,11 +764,8 @@ class StockReport:
         
         # Charts Section - Second set
         elements.append(Paragraph("Financial Metrics and Price Action", heading_style))
-        financial_metrics_img = self.plot_financial_metrics()
-        candlestick_img = self.plot_candlestick_chart()
-        
-        img3 = Image(financial_metrics_img, width=4*inch, height=2.4*inch)
-        img4 = Image(candlestick_img, width=4*inch, height=2.4*inch)
+        img3 = _chart_image(charts['financial_metrics'], width=CHART_WIDTH_IN['financial_metrics']*inch, height=2.4*inch)
+        img4 = _chart_image(charts['candlestick'], width=CHART_WIDTH_IN['candlestick']*inch, height=2.4*inch)
         chart_table2 = Table([[img3, img4]], colWidths=[4.2*inch, 4.2*inch])
         chart_table2.setStyle(TableStyle([
             ('ALIGN', (0, 0), (1, 0), 'CENTER'),
@@ -929,22 +776,19 @@ class StockReport:
         
         # Market Comparison Chart
         elements.append(Paragraph("Market Performance Comparison", heading_style))
-        comparison_img = self.plot_performance_comparison()
-        img5 = Image(comparison_img, width=8*inch, height=3*inch)
+        img5 = _chart_image(charts['performance_comparison'], width=CHART_WIDTH_IN['performance_comparison']*inch, height=3*inch)
         elements.append(img5)
         elements.append(Spacer(1, 0.2*inch))
         
         # Historical Performance (if data available)
         elements.append(Paragraph("Long-term Historical Performance", heading_style))
-        historical_img = self.plot_historical_performance()
-        img6 = Image(historical_img, width=8*inch, height=3*inch)
+        img6 = _chart_image(charts['historical_performance'], width=CHART_WIDTH_IN['historical_performance']*inch, height=3*inch)
         elements.append(img6)
         elements.append(Spacer(1, 0.2*inch))
         
         # Technical Indicators Chart
         elements.append(Paragraph("Technical Indicators Analysis", heading_style))
-        technical_img = self.plot_technical_indicators()
-        img7 = Image(technical_img, width=8*inch, height=5*inch)
+        img7 = _chart_image(charts['technical_indicators'], width=CHART_WIDTH_IN['technical_indicators']*inch, height=5*inch)
         elements.append(img7)
         elements.append(Spacer(1, 0.2*inch))
         
@@ -1051,10 +895,54 @@ class StockReport:
         # Build the PDF
         doc.build(elements)
         
-        return report_filename
+        return output.getvalue()
+
+def build_stock_report(ticker):
+    """
+    Build a stock report in memory and return (download filename, PDF bytes).
+    Nothing is written to the working directory.
+    """
+    report = StockReport(ticker)
+    return report.report_filename, report.build_pdf()
+
+def report_key(ticker, refresh=True):
+    """
+    Store key of `ticker`'s report: the ticker, the as-of date of its stored
+    price history (plus the intraday slot while NSE is open on that day) and
+    the report version, which covers the chart and output settings too.
+    With refresh=False the key comes from the history on disk, with no download.
+    """
+    symbol = ticker if ticker.endswith('.NS') else f"{ticker}.NS"
+    meta = ohlcv_store.read_meta(symbol)
+    if refresh:
+        try:
+            # Downloads only when the stored history is stale (quote schedule)
+            meta = ohlcv_store.update(symbol)
+        except Exception as e:
+            # Key by the stored history if Yahoo is unreachable, so an existing
+            # report can still be served (or answered with a 304)
+            print(f"Could not refresh stored history for {symbol}: {str(e)}")
+    as_of = meta["last"] if meta else "none"
+    
+    now = datetime.now(IST)
+    if is_market_open(now) and as_of == str(now.date()):
+        slot = (now.hour * 60 + now.minute) // INTRADAY_MINUTES * INTRADAY_MINUTES
+        as_of += f"T{slot // 60:02d}{slot % 60:02d}"
+    
+    settings = json.dumps([CHART_VERSION, IMAGE_FORMAT, CHART_DPI, SIZE_BUDGET_KB, CANDLE_PERIOD, HISTORY_PERIOD])
+    version = f"v{REPORT_VERSION}-{hashlib.sha256(settings.encode('utf-8')).hexdigest()[:8]}"
+    stem = re.sub(r'[^A-Za-z0-9^._-]', '_', symbol.upper().replace('.NS', ''))
+    return f"{stem}_{as_of}_{version}"
+
+def get_stock_report(ticker):
+    """
+    Stored report for `ticker` (a ReportArtifact with filename, PDF bytes, ETag
+    and Last-Modified), built only when no report exists for its key.
+    """
+    return report_store.get_or_build(report_key(ticker), lambda: build_stock_report(ticker))
 
 def generate_stock_report(ticker):
-    """Main function to generate a stock report"""
+    """Main function to generate a stock report file in the working directory"""
     try:
         report = StockReport(ticker)
         pdf_file = report.generate_pdf_report()
@@ -1,3 +1,4 @@
+import asyncio
 import datetime
 import traceback
 from langchain.agents import tool
@@ -5,7 +6,6 @@ from dotenv import load_dotenv
 import os
 import re
 from typing import List, Dict, Optional
-import requests
 import json
 from langchain_core.tools import Tool
 from langchain_community.tools import DuckDuckGoSearchRun
@@ -60,7 +60,101 @@ repl_tool = Tool(
 )
 
 # ======================================== STOCK FINANCE TOOLS ========================================
-import yfinance as yf
+from helper import http_client, ohlcv_store, resample, signal_events
+from helper.market_data import get_provider
+from helper.market_snapshot import cached_info
+from helper.ttl_cache import market_cache
+
+YAHOO_SEARCH_URL = "https://query1.finance.yahoo.com/v1/finance/search"
+YAHOO_SEARCH_HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36',
+    'Accept': 'application/json'
+}
+
+def _yahoo_search_params(company_name: str) -> dict:
+    return {"q": company_name, "lang": "en-US", "region": "US", "quotesCount": 10,
+            "newsCount": 0, "listsCount": 0, "enableFuzzyQuery": "true"}
+
+def _guess_ticker(company_name: str) -> str:
+    # Make a best guess for Indian stock
+    return f"{company_name.upper().replace(' ', '')}.NS"
+
+def _local_ticker(company_name: str) -> Optional[str]:
+    """Resolve ticker-like input and well-known Indian company names without a network call"""
+    # Check if it's already a valid ticker symbol
+    if re.match(r'^[a-z0-9.]+$', company_name):
+        # Check if it's an Indian stock that needs .NS suffix
+        if not '.' in company_name and not company_name.endswith('.ns'):
+            return f"{company_name.upper()}.NS"
+        return company_name.upper()
+    
+    # Special case handling for common Indian stocks
+    indian_stocks = {
+        "reliance": "RELIANCE.NS",
+        "tcs": "TCS.NS",
+        "hdfc bank": "HDFCBANK.NS", 
+        "hdfc": "HDFC.NS",
+        "infosys": "INFY.NS",
+        "tata motors": "TATAMOTORS.NS",
+        "tata steel": "TATASTEEL.NS",
+        "tata": "TATAMOTORS.NS",
+        "sbi": "SBIN.NS",
+        "adani": "ADANIENT.NS",
+        "adani green": "ADANIGREEN.NS",
+        "adani energy": "ADANIGREEN.NS",
+        "adani ports": "ADANIPORTS.NS",
+        "adani power": "ADANIPOWER.NS",
+        "bajaj finance": "BAJFINANCE.NS",
+        "maruti": "MARUTI.NS",
+        "maruti suzuki": "MARUTI.NS",
+        "rvnl": "RVNL.NS",
+        "rail vikas": "RVNL.NS",
+        "rail vikas nigam": "RVNL.NS",
+        "itc": "ITC.NS",
+        "wipro": "WIPRO.NS",
+        "axis bank": "AXISBANK.NS",
+        "kotak mahindra": "KOTAKBANK.NS",
+        "kotak bank": "KOTAKBANK.NS",
+        "larsen": "LT.NS",
+        "l&t": "LT.NS",
+        "larsen & toubro": "LT.NS",
+        "bharti airtel": "BHARTIARTL.NS",
+        "airtel": "BHARTIARTL.NS",
+        "hul": "HINDUNILVR.NS",
+        "hindustan unilever": "HINDUNILVR.NS",
+        "sun pharma": "SUNPHARMA.NS",
+        "icici bank": "ICICIBANK.NS"
+    }
+    
+    # Check if it's in our predefined list
+    for key, value in indian_stocks.items():
+        if key in company_name or company_name in key:
+            print(f"Found direct match for {company_name}: {value}")
+            return value
+    return None
+
+def _ticker_from_search(company_name: str, data: dict) -> str:
+    """Pick the best symbol from a Yahoo Finance search response"""
+    if 'quotes' in data and len(data['quotes']) > 0:
+        # Filter for Indian market first (.NS or .BO)
+        indian_stocks = [q for q in data['quotes'] if q['symbol'].endswith('.NS') or q['symbol'].endswith('.BO')]
+        
+        if indian_stocks:
+            symbol = indian_stocks[0]['symbol']
+            print(f"Found Indian stock for {company_name}: {symbol}")
+            return symbol
+        
+        # If no Indian stocks found, use the first result
+        symbol = data['quotes'][0]['symbol']
+        # Check if it's likely an Indian stock that needs .NS suffix
+        if re.match(r'^[A-Z]+$', symbol) and not '.' in symbol:
+            symbol = f"{symbol}.NS"
+            
+        print(f"Found ticker for {company_name}: {symbol}")
+        return symbol
+    
+    # If not found via API, try common suffix for Indian stocks
+    return _guess_ticker(company_name)
 
 def get_ticker_from_company(company_name: str) -> str:
     """
@@ -76,93 +170,45 @@ def get_ticker_from_company(company_name: str) -> str:
         # Clean up the input
         company_name = company_name.strip().lower()
         
-        # Check if it's already a valid ticker symbol
-        if re.match(r'^[a-z0-9.]+$', company_name):
-            # Check if it's an Indian stock that needs .NS suffix
-            if not '.' in company_name and not company_name.endswith('.ns'):
-                return f"{company_name.upper()}.NS"
-            return company_name.upper()
-        
-        # Special case handling for common Indian stocks
-        indian_stocks = {
-            "reliance": "RELIANCE.NS",
-            "tcs": "TCS.NS",
-            "hdfc bank": "HDFCBANK.NS", 
-            "hdfc": "HDFC.NS",
-            "infosys": "INFY.NS",
-            "tata motors": "TATAMOTORS.NS",
-            "tata steel": "TATASTEEL.NS",
-            "tata": "TATAMOTORS.NS",
-            "sbi": "SBIN.NS",
-            "adani": "ADANIENT.NS",
-            "adani green": "ADANIGREEN.NS",
-            "adani energy": "ADANIGREEN.NS",
-            "adani ports": "ADANIPORTS.NS",
-            "adani power": "ADANIPOWER.NS",
-            "bajaj finance": "BAJFINANCE.NS",
-            "maruti": "MARUTI.NS",
-            "maruti suzuki": "MARUTI.NS",
-            "rvnl": "RVNL.NS",
-            "rail vikas": "RVNL.NS",
-            "rail vikas nigam": "RVNL.NS",
-            "itc": "ITC.NS",
-            "wipro": "WIPRO.NS",
-            "axis bank": "AXISBANK.NS",
-            "kotak mahindra": "KOTAKBANK.NS",
-            "kotak bank": "KOTAKBANK.NS",
-            "larsen": "LT.NS",
-            "l&t": "LT.NS",
-            "larsen & toubro": "LT.NS",
-            "bharti airtel": "BHARTIARTL.NS",
-            "airtel": "BHARTIARTL.NS",
-            "hul": "HINDUNILVR.NS",
-            "hindustan unilever": "HINDUNILVR.NS",
-            "sun pharma": "SUNPHARMA.NS",
-            "icici bank": "ICICIBANK.NS"
-        }
-        
-        # Check if it's in our predefined list
-        for key, value in indian_stocks.items():
-            if key in company_name or company_name in key:
-                print(f"Found direct match for {company_name}: {value}")
-                return value
-        
-        # If not in our predefined list, search Yahoo Finance
-        base_url = f"https://query1.finance.yahoo.com/v1/finance/search?q={company_name}&lang=en-US&region=US&quotesCount=10&newsCount=0&listsCount=0&enableFuzzyQuery=true"
-        
-        headers = {
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36',
-            'Accept': 'application/json'
-        }
-        
-        response = requests.get(base_url, headers=headers)
-        data = response.json()
-        
-        if 'quotes' in data and len(data['quotes']) > 0:
-            # Filter for Indian market first (.NS or .BO)
-            indian_stocks = [q for q in data['quotes'] if q['symbol'].endswith('.NS') or q['symbol'].endswith('.BO')]
-            
-            if indian_stocks:
-                symbol = indian_stocks[0]['symbol']
-                print(f"Found Indian stock for {company_name}: {symbol}")
-                return symbol
-            
-            # If no Indian stocks found, use the first result
-            symbol = data['quotes'][0]['symbol']
-            # Check if it's likely an Indian stock that needs .NS suffix
-            if re.match(r'^[A-Z]+$', symbol) and not '.' in symbol:
-                symbol = f"{symbol}.NS"
-                
-            print(f"Found ticker for {company_name}: {symbol}")
+        symbol = _local_ticker(company_name)
+        if symbol:
             return symbol
         
-        # If not found via API, try common suffix for Indian stocks
-        return f"{company_name.upper().replace(' ', '')}.NS"
+        # If not in our predefined list, search Yahoo Finance (pooled connection)
+        data = http_client.fetch_json(YAHOO_SEARCH_URL, params=_yahoo_search_params(company_name), headers=YAHOO_SEARCH_HEADERS)
+        return _ticker_from_search(company_name, data)
     
     except Exception as e:
         print(f"Error finding ticker for {company_name}: {str(e)}")
-        # Make a best guess for Indian stock
-        return f"{company_name.upper().replace(' ', '')}.NS"
+        return _guess_ticker(company_name)
+
+async def get_ticker_from_company_async(company_name: str, client) -> str:
+    """
+    Async variant of get_ticker_from_company for batch jobs, so many lookups
+    can overlap on one event loop through an http_client.AsyncHttpClient.
+    """
+    try:
+        company_name = company_name.strip().lower()
+        
+        symbol = _local_ticker(company_name)
+        if symbol:
+            return symbol
+        
+        data = await client.get_json(YAHOO_SEARCH_URL, params=_yahoo_search_params(company_name), headers=YAHOO_SEARCH_HEADERS)
+        return _ticker_from_search(company_name, data)
+    
+    except Exception as e:
+        print(f"Error finding ticker for {company_name}: {str(e)}")
+        return _guess_ticker(company_name)
+
+def get_tickers_from_companies(company_names: List[str]) -> Dict[str, str]:
+    """
+    Ticker symbols for many company names at once. The Yahoo searches overlap
+    on the shared http_client event loop rather than blocking a thread each.
+    """
+    async def gather():
+        return await asyncio.gather(*(get_ticker_from_company_async(name, http_client.shared_client) for name in company_names))
+    return dict(zip(company_names, http_client.run(gather())))
 
 @tool
 def get_current_stock_price(company_name: str) -> str:
@@ -180,14 +226,14 @@ def get_current_stock_price(company_name: str) -> str:
         symbol = get_ticker_from_company(company_name)
         print(f"Using ticker symbol: {symbol}")
         
-        stock = yf.Ticker(symbol)
+        provider = get_provider()
         
         # Get basic info
-        info = stock.info
+        info = cached_info(symbol, provider)
         company_name = info.get('shortName', info.get('longName', symbol))
         
         # Get current price data
-        hist = stock.history(period='2d')  # Get 2 days to show change
+        hist = market_cache.get_or_fetch(("quote", symbol), "quote", lambda: provider.history(symbol, period='2d'))  # Get 2 days to show change
         
         if hist.empty:
             return f"No price data available for {company_name} ({symbol})"
@@ -225,22 +271,28 @@ def get_current_stock_price(company_name: str) -> str:
 @tool
 def get_stock_history(inputs: str) -> str:
     """
-    Get historical stock prices for a company over a specified period.
+    Get historical stock prices for a company over a specified period,
+    as daily bars or optionally as weekly, monthly or quarterly bars.
     
     Args:
-        inputs (str): A string in the format "company_name, period" where period is like 1d, 5d, 1mo, 3mo, 6mo, 1y, etc.
-                      Example: "Reliance Industries, 5d" or "RVNL, 1mo"
+        inputs (str): A string in the format "company_name, period[, interval]" where period is like 1d, 5d, 1mo, 3mo, 6mo, 1y, etc.
+                      and interval is 1d (default), 1wk, 1mo or 3mo.
+                      Example: "Reliance Industries, 5d", "RVNL, 1mo" or "TCS, 5y, 1mo"
     
     Returns:
         str: Historical stock price data formatted as a table.
     """
     try:
-        parts = inputs.split(",", 1)
-        if len(parts) != 2:
-            return "Please provide input in the format: company_name, period (e.g., 'Reliance, 5d')"
+        parts = inputs.split(",", 2)
+        if len(parts) < 2:
+            return "Please provide input in the format: company_name, period[, interval] (e.g., 'Reliance, 5d' or 'TCS, 5y, 1mo')"
         
         company_name = parts[0].strip()
         period = parts[1].strip()
+        interval = parts[2].strip() if len(parts) == 3 else "1d"
+        
+        if interval not in resample.INTERVALS:
+            return f"Invalid interval: {interval}. Use one of: {', '.join(resample.INTERVALS)}"
         
         # Validate period
         valid_periods = ['1d', '5d', '1mo', '3mo', '6mo', '1y', '2y', '5y', '10y', 'ytd', 'max']
@@ -250,15 +302,15 @@ def get_stock_history(inputs: str) -> str:
         
         # Get ticker and data
         ticker = get_ticker_from_company(company_name)
-        stock = yf.Ticker(ticker)
-        data = stock.history(period=period)
+        data = resample.history(ticker, interval, period)
         
         if data.empty:
             return f"No historical data available for {company_name} ({ticker}) over period {period}"
         
         # Format the results
-        company_info = stock.info.get('shortName', ticker)
-        result = f"Historical prices for {company_info} ({ticker}) over {period}:\n\n"
+        company_info = cached_info(ticker).get('shortName', ticker)
+        bar_label = {"1wk": ", weekly bars", "1mo": ", monthly bars", "3mo": ", quarterly bars"}.get(interval, "")
+        result = f"Historical prices for {company_info} ({ticker}) over {period}{bar_label}:\n\n"
         result += "Date         | Open    | High    | Low     | Close   | Volume\n"
         result += "-------------|---------|---------|---------|---------|------------\n"
         
@@ -275,7 +327,7 @@ def get_stock_history(inputs: str) -> str:
             result += f"{date} | {open_price:7} | {high:7} | {low:7} | {close:7} | {volume}\n"
         
         if max_rows < len(data):
-            result += f"\n[Showing {max_rows} of {len(data)} days. Request a shorter period for complete data.]"
+            result += f"\n[Showing {max_rows} of {len(data)} {'days' if interval == '1d' else 'bars'}. Request a shorter period for complete data.]"
             
         # Add summary statistics
         first_close = data['Close'].iloc[0]
@@ -326,11 +378,46 @@ def get_stock_news(company_name: str) -> str:
         traceback.print_exc()
         return error_msg
 
+@tool
+def get_recent_signals(inputs: str) -> str:
+    """
+    Get the most recent technical signals for a stock: golden/death crosses,
+    RSI overbought/oversold crossings, Bollinger band breakouts and large monthly moves.
+    
+    Args:
+        inputs (str): The company name or ticker, optionally followed by how many signals to return.
+                      Example: "Infosys" or "TCS, 10"
+    
+    Returns:
+        str: The latest signals, newest first.
+    """
+    try:
+        parts = inputs.split(",", 1)
+        company_name = parts[0].strip()
+        count = int(parts[1].strip()) if len(parts) == 2 and parts[1].strip().isdigit() else 5
+        
+        ticker = get_ticker_from_company(company_name)
+        signals = signal_events.last_signals(ticker, count)
+        
+        if not signals:
+            return f"No technical signals found for {company_name} ({ticker})"
+        
+        result = f"Recent technical signals for {company_name} ({ticker}):\n\n"
+        result += "\n".join(f"- {signal_events.describe_event(event)}" for event in signals)
+        return result
+        
+    except Exception as e:
+        error_msg = f"Error getting signals for {inputs}: {str(e)}"
+        print(error_msg)
+        traceback.print_exc()
+        return error_msg
+
 # Define the tools list for easy import in other files
 main_tools = [
     check_system_time,
     get_current_stock_price,
     get_stock_history,
+    get_recent_signals,
     get_stock_news,
     web_search,
     repl_tool